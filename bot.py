@@ -1,12 +1,21 @@
 import discord
 from discord.ext import commands
 import asyncio
+import hashlib
+import json
+import time
 import config
 
-from services.utils import ensure_state_file
-from cogs.tickets import TicketEntryView, TranscriptActionView
-from cogs.issue_tickets import IssueTicketEntryView, IssueThreadActionsView, IssueTranscriptView
-from services.database import init_db, get_all_tickets, get_all_issue_tickets
+from services.utils import (
+    ensure_state_file,
+    get_posted_message_id,
+    remember_posted_message,
+    get_command_hash,
+    remember_command_hash,
+)
+from cogs.tickets import TicketEntryView
+from cogs.issue_tickets import IssueTicketEntryView
+from services.database import init_db, start_cache_listener
 
 # -----------------------
 # Intents
@@ -17,9 +26,21 @@ intents.members = True
 intents.reactions = True
 intents.message_content = True
 
+# Lean profile: no member list download at login and no member cache
+# beyond voice; ticket flows fetch the members they need (see
+# services/utils.get_members). Full profile keeps discord.py's defaults.
+if config.GATEWAY_CACHE_PROFILE == "full":
+    member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+else:
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.voice = True
+
 bot = commands.Bot(
     command_prefix="!",
-    intents=intents
+    intents=intents,
+    member_cache_flags=member_cache_flags,
+    chunk_guilds_at_startup=config.GATEWAY_CACHE_PROFILE == "full",
+    max_messages=config.MESSAGE_CACHE_SIZE or None
 )
 
 # -----------------------
@@ -27,53 +48,108 @@ bot = commands.Bot(
 # -----------------------
 @bot.event
 async def on_ready():
+    # Runs again after every gateway reconnect; one-time work lives in
+    # startup() below
     print(f"[CSSBot] Logged in as {bot.user}")
 
-    # Sync commands
-    synced = await bot.tree.sync()
-    print(f"[CSSBot] Synced {len(synced)} commands")
 
-    # Register persistent views
-    bot.add_view(TicketEntryView())
+async def startup():
+    """One-time startup work that needs the gateway (scheduled from setup_hook)"""
+    await bot.wait_until_ready()
+    start = time.perf_counter()
+
+    # Independent steps run concurrently; a failing step is logged and
+    # does not stop the others
+    steps = [
+        sync_commands(bot),
+        ensure_ticket_entry_message(bot),
+        ensure_embed_posted_once(
+            bot,
+            "welcome",
+            config.WELCOME_CHANNEL_ID,
+            get_welcome_embed(),
+            "assets/ca_welcome.png"
+        ),
+        ensure_embed_posted_once(
+            bot,
+            "rules",
+            config.RULES_CHANNEL_ID,
+            get_rules_embed(),
+            "assets/ca_rules.png"
+        ),
+    ]
+    for result in await asyncio.gather(*steps, return_exceptions=True):
+        if isinstance(result, Exception):
+            print(f"[CSSBot] Startup step failed: {result!r}")
+
+    print(f"[CSSBot] Startup finished in {time.perf_counter() - start:.2f}s")
 
-    try:
-        all_tickets = get_all_tickets()
-        if all_tickets and isinstance(all_tickets, dict):
-            for ticket_id, ticket in all_tickets.items():
-                if isinstance(ticket, dict) and ticket.get("status") in ["OPEN", "PENDING"]:
-                    bot.add_view(TranscriptActionView(ticket_id))
-                    print(f"[CSSBot] Registered view for ticket {ticket_id}")
-    except Exception as e:
-        print(f"[CSSBot] Error fetching tickets: {e}")
-
-    # Register persistent views for issue tickets
-    try:
-        all_issue_tickets = get_all_issue_tickets()
-        if all_issue_tickets and isinstance(all_issue_tickets, dict):
-            for ticket_id, ticket in all_issue_tickets.items():
-                if isinstance(ticket, dict) and ticket.get("status") not in ["RESOLVED", "INVALID"]:
-                    bot.add_view(IssueThreadActionsView(ticket_id))
-                    bot.add_view(IssueTranscriptView(ticket_id))
-                    print(f"[CSSBot] Registered view for issue ticket {ticket_id}")
-    except Exception as e:
-        print(f"[CSSBot] Error fetching issue tickets: {e}")
-
-    await ensure_ticket_entry_message(bot)
-
-    # Ensure welcome and rules embeds are posted
-    await ensure_embed_posted_once(
-        bot,
-        config.WELCOME_CHANNEL_ID,
-        get_welcome_embed(),
-        "assets/ca_welcome.png"
-    )
 
-    await ensure_embed_posted_once(
-        bot,
-        config.RULES_CHANNEL_ID,
-        get_rules_embed(),
-        "assets/ca_rules.png"
+# -----------------------
+# Command sync
+# -----------------------
+def command_tree_hash(tree, guild=None) -> str:
+    """sha256 of the command payloads a sync would upload"""
+    payload = sorted(
+        (cmd.to_dict(tree) for cmd in tree.get_commands(guild=guild)),
+        key=lambda c: (c.get("type", 1), c["name"])
     )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+async def sync_commands(bot):
+    """
+    Upload the command tree only when it differs from the last successful
+    sync (hashes kept in state.json), since every sync is a rate-limited
+    round trip. With COMMAND_SYNC_GUILD the commands go to GUILD_ID only.
+    """
+    guild = None
+    if config.COMMAND_SYNC_GUILD and config.GUILD_ID:
+        guild = discord.Object(id=int(config.GUILD_ID))
+        bot.tree.copy_global_to(guild=guild)
+
+    scope = f"guild:{guild.id}" if guild else "global"
+    digest = command_tree_hash(bot.tree, guild)
+    if get_command_hash(scope) == digest:
+        print(f"[CSSBot] Commands unchanged, skipped {scope} sync")
+        return
+
+    if guild and get_command_hash(scope) is None:
+        # First guild sync: drop the global copies (synced before, possibly
+        # before hashes were kept) so the guild does not list them twice
+        bot.tree.clear_commands(guild=None)
+        await bot.tree.sync()
+        remember_command_hash("global", None)
+    elif not guild and config.GUILD_ID and get_command_hash(f"guild:{config.GUILD_ID}"):
+        # Back to global sync: drop the guild copies
+        old_guild = discord.Object(id=int(config.GUILD_ID))
+        bot.tree.clear_commands(guild=old_guild)
+        await bot.tree.sync(guild=old_guild)
+        remember_command_hash(f"guild:{config.GUILD_ID}", None)
+
+    synced = await bot.tree.sync(guild=guild)
+    remember_command_hash(scope, digest)
+    print(f"[CSSBot] Synced {len(synced)} commands ({scope})")
+
+
+async def find_posted_message(bot, channel, key, matches):
+    """
+    The bot's post remembered under key in state.json, checked with one
+    fetch_message. Falls back to scanning recent history (first run, or
+    the message was deleted) and remembers what it finds.
+    """
+    message_id = get_posted_message_id(key)
+    if message_id:
+        try:
+            return await channel.fetch_message(message_id)
+        except discord.NotFound:
+            pass
+
+    async for msg in channel.history(limit=25):
+        if msg.author == bot.user and matches(msg):
+            remember_posted_message(key, msg.id)
+            return msg
+    return None
 
 # -----------------------
 # Ensure entry message
@@ -84,9 +160,8 @@ async def ensure_ticket_entry_message(bot):
         print("[CSSBot] study-group-request channel not found")
         return
 
-    async for msg in channel.history(limit=25):
-        if msg.author == bot.user and msg.components:
-            return  # Entry message already exists
+    if await find_posted_message(bot, channel, "ticket_entry", lambda msg: msg.components):
+        return  # Entry message already exists
 
     embed = discord.Embed(
         title="📘 Study Group Requests",
@@ -99,10 +174,11 @@ async def ensure_ticket_entry_message(bot):
         color=0x2B6CB0
     )
 
-    await channel.send(
+    msg = await channel.send(
         embed=embed,
         view=TicketEntryView()
     )
+    remember_posted_message("ticket_entry", msg.id)
 
     print("[CSSBot] Entry button posted")
 
@@ -112,6 +188,7 @@ async def ensure_ticket_entry_message(bot):
 
 async def ensure_embed_posted_once(
     bot: commands.Bot,
+    key: str,
     channel_id: int,
     embed: discord.Embed,
     image_path: str = None
@@ -121,13 +198,10 @@ async def ensure_embed_posted_once(
         print(f"[CSSBot] Channel {channel_id} not found")
         return
 
-    async for msg in channel.history(limit=25):
-        if (
-            msg.author == bot.user
-            and msg.embeds
-            and msg.embeds[0].title == embed.title
-        ):
-            return  # Message already exists
+    if await find_posted_message(
+        bot, channel, key, lambda msg: msg.embeds and msg.embeds[0].title == embed.title
+    ):
+        return  # Message already exists
 
     # Prepare file if image path is provided
     file = None
@@ -139,10 +213,11 @@ async def ensure_embed_posted_once(
             print(f"[CSSBot] Warning: Image not found at {image_path}")
 
     if file:
-        await channel.send(embed=embed, file=file)
+        msg = await channel.send(embed=embed, file=file)
     else:
-        await channel.send(embed=embed)
-    
+        msg = await channel.send(embed=embed)
+    remember_posted_message(key, msg.id)
+
     print(f"[CSSBot] Posted: {embed.title}")
 
 def get_welcome_embed():
@@ -223,9 +298,21 @@ def get_rules_embed():
 # -----------------------
 @bot.event
 async def setup_hook():
-    await bot.load_extension("cogs.embeds")
-    await bot.load_extension("cogs.tickets")
-    await bot.load_extension("cogs.issue_tickets")
+    # Runs once per process, before the gateway connects. Cogs load
+    # concurrently (their cog_load hooks read from the database).
+    await asyncio.gather(
+        bot.load_extension("cogs.embeds"),
+        bot.load_extension("cogs.tickets"),
+        bot.load_extension("cogs.issue_tickets"),
+        bot.load_extension("cogs.admin"),
+    )
+
+    # Register persistent views
+    bot.add_view(TicketEntryView())
+    bot.add_view(IssueTicketEntryView())
+
+    # Kept on the bot so the task is not garbage collected mid-run
+    bot.startup_task = asyncio.create_task(startup())
 
 # -----------------------
 # Boot
@@ -233,4 +320,5 @@ async def setup_hook():
 if __name__ == "__main__":
     ensure_state_file()
     init_db()
+    start_cache_listener()
     bot.run(config.DISCORD_TOKEN)
\ No newline at end of file
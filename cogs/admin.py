@@ -0,0 +1,217 @@
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+import config
+
+from services.repository import (
+    get_pool_stats,
+    get_cache_stats,
+    checkpoint_wal,
+    get_ticket_stats,
+    fold_ticket_stats,
+    archive_closed_tickets,
+    backup_database,
+)
+from services.stats import approx_median, format_duration
+from services.utils import member_fetch_stats
+
+
+def _format_counts(counts: dict, order=None) -> str:
+    keys = order or sorted(counts, key=counts.get, reverse=True)
+    return "\n".join(f"{key}: {counts.get(key, 0)}" for key in keys) or "—"
+
+
+# -----------------------
+# Admin / Maintenance Cog
+# -----------------------
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        if config.SQLITE_CHECKPOINT_MINUTES > 0:
+            self.wal_checkpoint.change_interval(minutes=config.SQLITE_CHECKPOINT_MINUTES)
+            self.wal_checkpoint.start()
+        if config.RETENTION_DAYS > 0:
+            self.retention.start()
+        if config.BACKUP_INTERVAL_HOURS > 0:
+            self.scheduled_backup.change_interval(hours=config.BACKUP_INTERVAL_HOURS)
+            self.scheduled_backup.start()
+        self.stats_fold.change_interval(seconds=max(config.STATS_FOLD_SECONDS, 1))
+        self.stats_fold.start()
+
+    async def cog_unload(self):
+        self.wal_checkpoint.cancel()
+        self.retention.cancel()
+        self.scheduled_backup.cancel()
+        self.stats_fold.cancel()
+
+    # ---------- SQLITE WAL CHECKPOINT ----------
+    @tasks.loop(minutes=10)
+    async def wal_checkpoint(self):
+        try:
+            result = await checkpoint_wal()
+        except Exception as e:
+            print(f"[Admin] WAL checkpoint failed: {e}")
+            return
+
+        if result is None:
+            # Not running on SQLite WAL; nothing to do
+            self.wal_checkpoint.cancel()
+
+    # ---------- STATS ROLLUP ----------
+    @tasks.loop(seconds=60)
+    async def stats_fold(self):
+        try:
+            await fold_ticket_stats()
+        except Exception as e:
+            print(f"[Admin] Folding ticket stats failed: {e}")
+
+    # ---------- RETENTION ----------
+    @tasks.loop(hours=24)
+    async def retention(self):
+        try:
+            moved = await archive_closed_tickets(config.RETENTION_DAYS)
+        except Exception as e:
+            print(f"[Admin] Retention run failed: {e}")
+            return
+
+        if any(moved.values()):
+            print(
+                f"[Admin] Archived {moved['study']} study and {moved['issue']} issue tickets "
+                f"closed over {config.RETENTION_DAYS} days ago"
+            )
+
+    # ---------- BACKUPS ----------
+    @tasks.loop(hours=24)
+    async def scheduled_backup(self):
+        try:
+            result = await backup_database()
+        except Exception as e:
+            print(f"[Admin] Scheduled backup failed: {e}")
+            return
+
+        print(
+            f"[Admin] Backup written to {result['path']} "
+            f"({result['size_bytes'] / 1024 / 1024:.1f} MiB in {result['seconds']:.1f}s)"
+        )
+
+    @app_commands.command(
+        name="backup_now",
+        description="Take a compressed database backup right now"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def backup_now(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            result = await backup_database()
+        except Exception as e:
+            await interaction.followup.send(f"❌ Backup failed: {e}", ephemeral=True)
+            return
+
+        await interaction.followup.send(
+            f"✅ Backup written to `{result['path']}`\n"
+            f"Size: {result['size_bytes'] / 1024 / 1024:.2f} MiB • Took {result['seconds']:.1f}s",
+            ephemeral=True
+        )
+
+    # ---------- DB STATS ----------
+    @app_commands.command(
+        name="db_stats",
+        description="Show database pool and ticket cache statistics"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def db_stats(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="🗄️ Database Stats", color=0x2B6CB0)
+
+        for name, pool in get_pool_stats().items():
+            embed.add_field(
+                name=f"Pool ({name})",
+                value=(
+                    f"{pool['status']}\n"
+                    f"Checkouts: {pool['checkouts']}\n"
+                    f"Wait avg/max: {pool['avg_wait_ms']:.1f} / {pool['max_wait_ms']:.1f} ms"
+                ),
+                inline=False
+            )
+
+        for name, cache in get_cache_stats().items():
+            embed.add_field(
+                name=f"Cache ({name})",
+                value=(
+                    f"{cache['size']}/{cache['max_size']} entries\n"
+                    f"Hits/misses: {cache['hits']}/{cache['misses']} "
+                    f"({cache['hit_rate']:.0%})\n"
+                    f"Evictions: {cache['evictions']}"
+                ),
+                inline=True
+            )
+
+        guild = interaction.guild
+        fetches = member_fetch_stats
+        embed.add_field(
+            name=f"Gateway cache ({config.GATEWAY_CACHE_PROFILE})",
+            value=(
+                f"Members cached: {len(guild.members)}/{guild.member_count}\n"
+                f"Messages cached: {len(self.bot.cached_messages)}/{config.MESSAGE_CACHE_SIZE}\n"
+                f"Member fetches: {fetches['queries']} "
+                f"(avg {fetches['seconds'] * 1000 / max(fetches['queries'], 1):.0f} ms)"
+            ),
+            inline=False
+        )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ---------- TICKET STATS ----------
+    @app_commands.command(
+        name="ticket_stats",
+        description="Show ticket queue depth, claims and turnaround times"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def ticket_stats(self, interaction: discord.Interaction):
+        stats = await get_ticket_stats(days=7)
+        embed = discord.Embed(
+            title="📈 Ticket Stats",
+            description="Medians are approximate (upper bound of the bucket).",
+            color=0x2B6CB0
+        )
+
+        sections = [
+            ("Study groups", stats["study"], ["OPEN", "CLAIMED", "APPROVED", "CANCELLED"], ["level"]),
+            ("Issues", stats["issue"], ["OPEN", "IN_PROGRESS", "ESCALATED", "RESOLVED", "INVALID"], ["category", "priority"]),
+        ]
+        for label, kind, statuses, dimensions in sections:
+            embed.add_field(
+                name=f"{label} — status",
+                value=_format_counts(kind.get("status", {}), statuses),
+                inline=True
+            )
+            for metric in dimensions:
+                embed.add_field(
+                    name=f"{label} — {metric}",
+                    value=_format_counts(kind.get(metric, {})),
+                    inline=True
+                )
+
+            claimers = sorted(kind.get("claims_by", {}).items(), key=lambda item: item[1], reverse=True)[:5]
+            last_days = sorted(kind.get("created_day", {}).items())
+            embed.add_field(
+                name=f"{label} — turnaround",
+                value=(
+                    f"Median to claim: ≤ {format_duration(approx_median(kind.get('claim_time', {})))}\n"
+                    f"Median to close: ≤ {format_duration(approx_median(kind.get('close_time', {})))}\n"
+                    f"Created (7d): {sum(count for _, count in last_days)}\n"
+                    f"Top claimers: {', '.join(f'<@{uid}> ({n})' for uid, n in claimers) or '—'}"
+                ),
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+# -----------------------
+# Setup
+# -----------------------
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
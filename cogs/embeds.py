@@ -2,27 +2,10 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 from datetime import datetime
-import json
-import os
 import config
 
 from services.icai_scraper import fetch_todays_announcements
-
-
-# -----------------------
-# State helpers
-# -----------------------
-STATE_FILE = "data/state.json"
-
-
-def load_state():
-    with open(STATE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_state(state):
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+from services.utils import load_state, save_state
 
 
 # -----------------------
@@ -303,6 +286,8 @@ class Embeds(commands.Cog):
             await channel.send(embed=embed)
             posted.add(ann["id"])
 
+        # Re-read so keys written by other tasks while we were posting survive
+        state = load_state()
         state["posted_announcements"] = list(posted)
         save_state(state)
 
@@ -1,18 +1,44 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 import asyncio
-import io
 import config
 
-from services.database import (
+from services.records import IssueTicketRecord
+from services.dedupe import DuplicateIndex
+from services.utils import (
+    parse_date,
+    format_ticket_history,
+    get_members,
+    get_role_members,
+    note_member_roles,
+    custom_id_ticket_id,
+)
+from services.repository import (
     get_issue_ticket,
+    find_issue_ticket_id,
     get_all_issue_tickets,
     save_issue_ticket,
+    claim_issue_ticket,
+    claim_next_issue_ticket,
+    escalate_issue_ticket,
+    resolve_issue_ticket,
+    invalidate_issue_ticket,
     next_issue_ticket_id,
-    export_issue_tickets_json,
+    iter_issue_ticket_export_parts,
     get_issue_tickets_by_status,
+    get_ticket_events,
+    search_issue_tickets,
+    get_active_issue_tickets_since,
+    record_duplicate_report,
+)
+
+# Fingerprints of recent open reports; see services/dedupe.py
+duplicate_index = DuplicateIndex(
+    config.DUPLICATE_THRESHOLD,
+    timedelta(hours=config.DUPLICATE_WINDOW_HOURS)
 )
 
 # You'll need to add these to config.py:
@@ -40,24 +66,24 @@ async def post_issue_transcript(bot, ticket_id, ticket):
 
     embed = discord.Embed(
         title=f"🎫 Issue Ticket {ticket_id}",
-        color=colors.get(ticket["priority"], 0x95A5A6),
+        color=colors.get(ticket.priority, 0x95A5A6),
         timestamp=datetime.utcnow()
     )
 
-    embed.add_field(name="Category", value=ticket["category"], inline=True)
-    embed.add_field(name="Priority", value=ticket["priority"], inline=True)
-    embed.add_field(name="Anonymous", value="Yes" if ticket["anonymous"] else "No", inline=True)
-    embed.add_field(name="Reported By", value=f"<@{ticket['created_by']}>", inline=False)
+    embed.add_field(name="Category", value=ticket.category, inline=True)
+    embed.add_field(name="Priority", value=ticket.priority, inline=True)
+    embed.add_field(name="Anonymous", value="Yes" if ticket.anonymous else "No", inline=True)
+    embed.add_field(name="Reported By", value=f"<@{ticket.created_by}>", inline=False)
     
-    if ticket.get("reported_user"):
-        embed.add_field(name="Reported User", value=f"<@{ticket['reported_user']}>", inline=False)
+    if ticket.reported_user:
+        embed.add_field(name="Reported User", value=f"<@{ticket.reported_user}>", inline=False)
     
-    embed.add_field(name="Description", value=ticket["description"][:1024], inline=False)
-    embed.add_field(name="Thread", value=f"<#{ticket['thread_id']}>", inline=False)
+    embed.add_field(name="Description", value=ticket.description[:1024], inline=False)
+    embed.add_field(name="Thread", value=f"<#{ticket.thread_id}>", inline=False)
     embed.add_field(name="Status", value="🟡 OPEN - Awaiting Mod Review", inline=False)
 
     msg = await channel.send(embed=embed, view=IssueTranscriptView(ticket_id))
-    return str(msg.id)
+    return msg.id
 
 
 async def update_issue_transcript(bot, ticket_id, ticket, status_text, additional_info=None):
@@ -67,7 +93,7 @@ async def update_issue_transcript(bot, ticket_id, ticket, status_text, additiona
         return
 
     try:
-        msg = await channel.fetch_message(int(ticket["transcript_message_id"]))
+        msg = await channel.fetch_message(int(ticket.transcript_message_id))
     except (discord.NotFound, ValueError, TypeError):
         return
 
@@ -84,7 +110,7 @@ async def update_issue_transcript(bot, ticket_id, ticket, status_text, additiona
         embed.add_field(name="Updates", value=additional_info, inline=False)
     
     # Remove buttons if closed
-    view = None if ticket["status"] in ["RESOLVED", "CLOSED", "INVALID"] else IssueTranscriptView(ticket_id)
+    view = None if ticket.status in ["RESOLVED", "CLOSED", "INVALID"] else IssueTranscriptView(ticket_id)
     
     await msg.edit(embed=embed, view=view)
 
@@ -98,7 +124,7 @@ async def create_issue_thread(guild, ticket_id, ticket, mod_role, tickets_channe
     
     # Create the private thread
     thread = await tickets_channel.create_thread(
-        name=f"🎫 {ticket_id} - {ticket['category']}",
+        name=f"🎫 {ticket_id} - {ticket.category}",
         type=discord.ChannelType.private_thread,
         auto_archive_duration=10080,  # 7 days
         reason=f"Issue ticket {ticket_id} created"
@@ -106,8 +132,8 @@ async def create_issue_thread(guild, ticket_id, ticket, mod_role, tickets_channe
 
     # Add moderators (they can see all private threads in the channel)
     # Add creator if not anonymous
-    if not ticket["anonymous"]:
-        creator = guild.get_member(ticket["created_by"])
+    if not ticket.anonymous:
+        creator = (await get_members(guild, [ticket.created_by])).get(ticket.created_by)
         if creator:
             try:
                 await thread.add_user(creator)
@@ -115,29 +141,28 @@ async def create_issue_thread(guild, ticket_id, ticket, mod_role, tickets_channe
                 pass
 
     # Get all members with mod role and add them
-    for member in guild.members:
-        if mod_role in member.roles:
-            try:
-                await thread.add_user(member)
-            except discord.HTTPException:
-                continue
+    for member in await get_role_members(guild, mod_role):
+        try:
+            await thread.add_user(member)
+        except discord.HTTPException:
+            continue
 
     # Send initial message in thread
     embed = discord.Embed(
         title=f"Issue Ticket {ticket_id}",
-        description=ticket["description"],
+        description=ticket.description,
         color=0xE74C3C,
         timestamp=datetime.utcnow()
     )
     
-    embed.add_field(name="Category", value=ticket["category"], inline=True)
-    embed.add_field(name="Priority", value=ticket["priority"], inline=True)
+    embed.add_field(name="Category", value=ticket.category, inline=True)
+    embed.add_field(name="Priority", value=ticket.priority, inline=True)
     
-    if ticket.get("reported_user"):
-        embed.add_field(name="Reported User", value=f"<@{ticket['reported_user']}>", inline=False)
+    if ticket.reported_user:
+        embed.add_field(name="Reported User", value=f"<@{ticket.reported_user}>", inline=False)
     
-    if not ticket["anonymous"]:
-        embed.add_field(name="Reported By", value=f"<@{ticket['created_by']}>", inline=False)
+    if not ticket.anonymous:
+        embed.add_field(name="Reported By", value=f"<@{ticket.created_by}>", inline=False)
     else:
         embed.add_field(name="Reported By", value="*Anonymous*", inline=False)
     
@@ -165,34 +190,35 @@ class IssueTicketModal(discord.ui.Modal, title="Report an Issue"):
         max_length=1000
     )
 
-    def __init__(self, category, priority, anonymous, reported_user=None):
+    def __init__(self, category, priority, anonymous, reported_user=None, skip_duplicate_check=False):
         super().__init__()
         self.category = category
         self.priority = priority
         self.anonymous = anonymous
         self.reported_user = reported_user
+        self.skip_duplicate_check = skip_duplicate_check
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
-        ticket_id = next_issue_ticket_id()
+        if config.DUPLICATE_THRESHOLD > 0 and not self.skip_duplicate_check:
+            match = await asyncio.to_thread(duplicate_index.find, self.description.value, self.reported_user)
+            if match and await self.link_duplicate(interaction, *match):
+                return
+
+        ticket_id = await next_issue_ticket_id()
         
-        ticket = {
-            "category": self.category,
-            "priority": self.priority,
-            "description": self.description.value,
-            "created_by": interaction.user.id,
-            "anonymous": self.anonymous,
-            "reported_user": self.reported_user,
-            "status": "OPEN",
-            "claimed_by": None,
-            "escalated": False,
-            "escalated_by": None,
-            "resolution": None,
-            "created_at": datetime.utcnow().isoformat(),
-            "thread_id": None,
-            "transcript_message_id": None,
-        }
+        ticket = IssueTicketRecord(
+            id=ticket_id,
+            category=self.category,
+            priority=self.priority,
+            description=self.description.value,
+            created_by=interaction.user.id,
+            status="OPEN",
+            anonymous=self.anonymous,
+            reported_user=self.reported_user,
+            created_at=datetime.utcnow(),
+        )
 
         # Get the tickets channel
         tickets_channel = interaction.guild.get_channel(config.ISSUE_TICKETS_CHANNEL_ID)
@@ -206,15 +232,16 @@ class IssueTicketModal(discord.ui.Modal, title="Report an Issue"):
             interaction.guild, ticket_id, ticket, mod_role, tickets_channel
         )
 
-        ticket["thread_id"] = thread.id
+        ticket = replace(ticket, thread_id=thread.id)
 
         # Post transcript
-        ticket["transcript_message_id"] = await post_issue_transcript(
-            interaction.client, ticket_id, ticket
+        ticket = replace(
+            ticket,
+            transcript_message_id=await post_issue_transcript(interaction.client, ticket_id, ticket)
         )
 
         # Store ticket in database
-        save_issue_ticket(ticket_id, ticket)
+        await save_issue_ticket(ticket)
 
         await interaction.followup.send(
             f"✅ Issue ticket **{ticket_id}** created successfully.\n"
@@ -223,8 +250,62 @@ class IssueTicketModal(discord.ui.Modal, title="Report an Issue"):
             ephemeral=True
         )
 
+        await asyncio.to_thread(
+            duplicate_index.add, ticket_id, ticket.description, ticket.reported_user, thread.id, ticket.created_at
+        )
+
         print(f"[IssueTickets] Created {ticket_id} by user {interaction.user.id} - Thread: {thread.id}")
 
+    async def link_duplicate(self, interaction, ticket_id, thread_id, score):
+        """Add this report to an existing ticket's thread; False to open a new ticket instead"""
+        thread = interaction.guild.get_thread(thread_id)
+        if thread is None:
+            try:
+                thread = await interaction.client.fetch_channel(thread_id)
+            except discord.HTTPException:
+                thread = None
+
+        if not isinstance(thread, discord.Thread) or thread.locked:
+            duplicate_index.remove(ticket_id)
+            return False
+
+        if not await record_duplicate_report(ticket_id, interaction.user.id, self.description.value):
+            duplicate_index.remove(ticket_id)
+            return False
+
+        embed = discord.Embed(
+            title=f"Additional Report for {ticket_id}",
+            description=self.description.value,
+            color=0xE67E22,
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="Category", value=self.category, inline=True)
+        embed.add_field(name="Priority", value=self.priority, inline=True)
+        if self.reported_user:
+            embed.add_field(name="Reported User", value=f"<@{self.reported_user}>", inline=False)
+        embed.add_field(
+            name="Reported By",
+            value="*Anonymous*" if self.anonymous else f"<@{interaction.user.id}>",
+            inline=False
+        )
+        embed.set_footer(text=f"Matched as a likely duplicate ({min(score, 1.0):.0%} similar)")
+        await thread.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+        # The reporter is not added to the thread: it belongs to the first
+        # reporter and shows their identity and the mods' discussion so far.
+        # Mods can reach this reporter through the embed above.
+        await interaction.followup.send(
+            f"ℹ️ This looks like the same issue as **{ticket_id}**, which moderators are already handling.\n"
+            f"Your report has been linked to it{' anonymously' if self.anonymous else ''}, "
+            f"and a moderator will contact you if they need more details.\n\n"
+            f"If this is a different issue, open the report form again and turn on "
+            f"**Not a Duplicate** before submitting.",
+            ephemeral=True
+        )
+
+        print(f"[IssueTickets] Report by user {interaction.user.id} linked to {ticket_id} (score {score:.2f})")
+        return True
+
 
 # =================================================
 # Issue Creation Form View
@@ -238,6 +319,7 @@ class IssueTicketFormView(discord.ui.View):
         self.priority = "Medium"
         self.anonymous = False
         self.reported_user = None
+        self.skip_duplicate_check = False
 
         self.embed = discord.Embed(
             title="Report an Issue",
@@ -269,6 +351,14 @@ class IssueTicketFormView(discord.ui.View):
         self.update_embed()
         await interaction.response.edit_message(embed=self.embed, view=self)
 
+    @discord.ui.button(label="🔀 Not a Duplicate", style=discord.ButtonStyle.secondary, row=4)
+    async def toggle_duplicate_check(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Skips linking to a similar open report, for issues that only look alike
+        self.skip_duplicate_check = not self.skip_duplicate_check
+        button.label = "🔀 Not a Duplicate: ON" if self.skip_duplicate_check else "🔀 Not a Duplicate"
+        button.style = discord.ButtonStyle.success if self.skip_duplicate_check else discord.ButtonStyle.secondary
+        await interaction.response.edit_message(embed=self.embed, view=self)
+
     @discord.ui.button(label="Submit Issue", style=discord.ButtonStyle.danger, row=4)
     async def submit(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not self.category:
@@ -280,7 +370,8 @@ class IssueTicketFormView(discord.ui.View):
                 self.category,
                 self.priority,
                 self.anonymous,
-                self.reported_user
+                self.reported_user,
+                self.skip_duplicate_check
             )
         )
 
@@ -338,50 +429,96 @@ class ReportedUserSelect(discord.ui.UserSelect):
 # Thread Action Buttons (For Mods)
 # =================================================
 
-class IssueThreadActionsView(discord.ui.View):
+async def record_issue_claim(bot, ticket_id, mod):
+    """Side effects of a won claim shared by the Claim button and /claim_next_issue"""
+    ticket = await get_issue_ticket(ticket_id)
+
+    await update_issue_transcript(
+        bot,
+        ticket_id,
+        ticket,
+        f"🔵 IN PROGRESS - Claimed by <@{mod.id}>"
+    )
+    return ticket
+
+
+async def _thread_ticket_id(interaction, match):
+    return await custom_id_ticket_id(match, find_issue_ticket_id, thread_id=interaction.channel_id)
+
+
+async def _transcript_ticket_id(interaction, match):
+    return await custom_id_ticket_id(match, find_issue_ticket_id, transcript_message_id=interaction.message.id)
+
+
+class IssueClaimButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:issue_claim:(?P<ticket_id>ISS-\d+)|issue_claim"
+):
     def __init__(self, ticket_id):
-        super().__init__(timeout=None)
+        super().__init__(
+            discord.ui.Button(
+                label="Claim Ticket",
+                style=discord.ButtonStyle.primary,
+                emoji="✋",
+                custom_id=f"cssbot:issue_claim:{ticket_id}" if ticket_id else "issue_claim"
+            )
+        )
         self.ticket_id = ticket_id
 
-    @discord.ui.button(label="Claim Ticket", style=discord.ButtonStyle.primary, emoji="✋", custom_id="issue_claim")
-    async def claim(self, interaction: discord.Interaction, button: discord.ui.Button):
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _thread_ticket_id(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
         # Check if user is mod
         mod_role = interaction.guild.get_role(config.MOD_ROLE_ID)
         if mod_role not in interaction.user.roles and not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("❌ Moderators only.", ephemeral=True)
             return
 
-        ticket = get_issue_ticket(self.ticket_id)
-        if not ticket:
-            await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
-            return
-
-        if ticket["claimed_by"]:
-            await interaction.response.send_message(
-                f"⚠️ This ticket is already claimed by <@{ticket['claimed_by']}>.",
-                ephemeral=True
-            )
+        if not await claim_issue_ticket(self.ticket_id, interaction.user.id):
+            ticket = await get_issue_ticket(self.ticket_id)
+            if not ticket:
+                await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
+            elif ticket.claimed_by:
+                await interaction.response.send_message(
+                    f"⚠️ This ticket is already claimed by <@{ticket.claimed_by}>.",
+                    ephemeral=True
+                )
+            else:
+                await interaction.response.send_message(
+                    f"⚠️ This ticket is already {ticket.status}.", ephemeral=True
+                )
             return
 
-        ticket["claimed_by"] = interaction.user.id
-        ticket["status"] = "IN_PROGRESS"
-
-        save_issue_ticket(self.ticket_id, ticket)
-
-        await update_issue_transcript(
-            interaction.client,
-            self.ticket_id,
-            ticket,
-            f"🔵 IN PROGRESS - Claimed by <@{interaction.user.id}>"
-        )
+        await record_issue_claim(interaction.client, self.ticket_id, interaction.user)
 
         await interaction.response.send_message(
             f"✅ {interaction.user.mention} has claimed this ticket and is now handling it.",
             allowed_mentions=discord.AllowedMentions.none()
         )
 
-    @discord.ui.button(label="Escalate to Admin", style=discord.ButtonStyle.danger, emoji="⬆️", custom_id="issue_escalate")
-    async def escalate(self, interaction: discord.Interaction, button: discord.ui.Button):
+
+class IssueEscalateButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:issue_escalate:(?P<ticket_id>ISS-\d+)|issue_escalate"
+):
+    def __init__(self, ticket_id):
+        super().__init__(
+            discord.ui.Button(
+                label="Escalate to Admin",
+                style=discord.ButtonStyle.danger,
+                emoji="⬆️",
+                custom_id=f"cssbot:issue_escalate:{ticket_id}" if ticket_id else "issue_escalate"
+            )
+        )
+        self.ticket_id = ticket_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _thread_ticket_id(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
         # Check permissions
         mod_role = interaction.guild.get_role(config.MOD_ROLE_ID)
         admin_role = interaction.guild.get_role(config.ADMIN_ROLE_ID)
@@ -390,30 +527,31 @@ class IssueThreadActionsView(discord.ui.View):
             await interaction.response.send_message("❌ Moderators only.", ephemeral=True)
             return
 
-        ticket = get_issue_ticket(self.ticket_id)
-        if not ticket:
-            await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
-            return
+        # The admin lookup below can go to the gateway; answer Discord first
+        await interaction.response.defer(ephemeral=True)
 
-        if ticket["escalated"]:
-            await interaction.response.send_message("⚠️ This ticket is already escalated.", ephemeral=True)
+        if not await escalate_issue_ticket(self.ticket_id, interaction.user.id):
+            ticket = await get_issue_ticket(self.ticket_id)
+            if not ticket:
+                await interaction.followup.send("⚠️ Ticket not found.", ephemeral=True)
+            elif ticket.escalated:
+                await interaction.followup.send("⚠️ This ticket is already escalated.", ephemeral=True)
+            else:
+                await interaction.followup.send(
+                    f"⚠️ This ticket is already {ticket.status}.", ephemeral=True
+                )
             return
 
-        ticket["escalated"] = True
-        ticket["escalated_by"] = interaction.user.id
-        ticket["status"] = "ESCALATED"
-
-        save_issue_ticket(self.ticket_id, ticket)
+        ticket = await get_issue_ticket(self.ticket_id)
 
         # Add all admins to the thread
         thread = interaction.channel
         if isinstance(thread, discord.Thread):
-            for member in interaction.guild.members:
-                if admin_role in member.roles:
-                    try:
-                        await thread.add_user(member)
-                    except discord.HTTPException:
-                        continue
+            for member in await get_role_members(interaction.guild, admin_role):
+                try:
+                    await thread.add_user(member)
+                except discord.HTTPException:
+                    continue
 
         await update_issue_transcript(
             interaction.client,
@@ -422,21 +560,40 @@ class IssueThreadActionsView(discord.ui.View):
             f"🔴 ESCALATED - Escalated by <@{interaction.user.id}>"
         )
 
-        await interaction.response.send_message(
+        await interaction.followup.send(
             f"⬆️ {admin_role.mention} This ticket has been escalated and requires admin attention.\n"
             f"Escalated by: {interaction.user.mention}",
             allowed_mentions=discord.AllowedMentions(roles=True)
         )
 
-    @discord.ui.button(label="Resolve Ticket", style=discord.ButtonStyle.success, emoji="✅", custom_id="issue_resolve")
-    async def resolve(self, interaction: discord.Interaction, button: discord.ui.Button):
+
+class IssueResolveButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:issue_resolve:(?P<ticket_id>ISS-\d+)|issue_resolve"
+):
+    def __init__(self, ticket_id):
+        super().__init__(
+            discord.ui.Button(
+                label="Resolve Ticket",
+                style=discord.ButtonStyle.success,
+                emoji="✅",
+                custom_id=f"cssbot:issue_resolve:{ticket_id}" if ticket_id else "issue_resolve"
+            )
+        )
+        self.ticket_id = ticket_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _thread_ticket_id(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
         # Check permissions
         mod_role = interaction.guild.get_role(config.MOD_ROLE_ID)
         if mod_role not in interaction.user.roles and not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("❌ Moderators/Admins only.", ephemeral=True)
             return
 
-        ticket = get_issue_ticket(self.ticket_id)
+        ticket = await get_issue_ticket(self.ticket_id)
         if not ticket:
             await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
             return
@@ -445,15 +602,34 @@ class IssueThreadActionsView(discord.ui.View):
             ResolveTicketModal(self.ticket_id, interaction.client)
         )
 
-    @discord.ui.button(label="Mark as Invalid", style=discord.ButtonStyle.secondary, emoji="❌", custom_id="issue_invalid")
-    async def mark_invalid(self, interaction: discord.Interaction, button: discord.ui.Button):
+
+class IssueInvalidButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:issue_invalid:(?P<ticket_id>ISS-\d+)|issue_invalid"
+):
+    def __init__(self, ticket_id):
+        super().__init__(
+            discord.ui.Button(
+                label="Mark as Invalid",
+                style=discord.ButtonStyle.secondary,
+                emoji="❌",
+                custom_id=f"cssbot:issue_invalid:{ticket_id}" if ticket_id else "issue_invalid"
+            )
+        )
+        self.ticket_id = ticket_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _thread_ticket_id(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
         # Check permissions
         mod_role = interaction.guild.get_role(config.MOD_ROLE_ID)
         if mod_role not in interaction.user.roles and not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("❌ Moderators/Admins only.", ephemeral=True)
             return
 
-        ticket = get_issue_ticket(self.ticket_id)
+        ticket = await get_issue_ticket(self.ticket_id)
         if not ticket:
             await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
             return
@@ -463,6 +639,16 @@ class IssueThreadActionsView(discord.ui.View):
         )
 
 
+class IssueThreadActionsView(discord.ui.View):
+    def __init__(self, ticket_id):
+        super().__init__(timeout=None)
+        self.ticket_id = ticket_id
+        self.add_item(IssueClaimButton(ticket_id))
+        self.add_item(IssueEscalateButton(ticket_id))
+        self.add_item(IssueResolveButton(ticket_id))
+        self.add_item(IssueInvalidButton(ticket_id))
+
+
 # =================================================
 # Resolution Modals
 # =================================================
@@ -484,17 +670,13 @@ class ResolveTicketModal(discord.ui.Modal, title="Resolve Issue Ticket"):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        ticket = get_issue_ticket(self.ticket_id)
-        if not ticket:
-            await interaction.followup.send("⚠️ Ticket not found.", ephemeral=True)
+        if not await resolve_issue_ticket(self.ticket_id, interaction.user.id, self.resolution.value):
+            await interaction.followup.send("⚠️ Ticket not found or already closed.", ephemeral=True)
             return
 
-        ticket["status"] = "RESOLVED"
-        ticket["resolution"] = self.resolution.value
-        ticket["resolved_by"] = interaction.user.id
-        ticket["resolved_at"] = datetime.utcnow().isoformat()
+        duplicate_index.remove(self.ticket_id)
 
-        save_issue_ticket(self.ticket_id, ticket)
+        ticket = await get_issue_ticket(self.ticket_id)
 
         await update_issue_transcript(
             self.bot,
@@ -506,7 +688,7 @@ class ResolveTicketModal(discord.ui.Modal, title="Resolve Issue Ticket"):
 
         # Notify ticket creator via DM
         try:
-            creator = await self.bot.fetch_user(ticket["created_by"])
+            creator = await self.bot.fetch_user(ticket.created_by)
             embed = discord.Embed(
                 title=f"✅ Your Issue Ticket {self.ticket_id} Has Been Resolved",
                 description=self.resolution.value,
@@ -551,16 +733,13 @@ class InvalidTicketModal(discord.ui.Modal, title="Mark as Invalid"):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        ticket = get_issue_ticket(self.ticket_id)
-        if not ticket:
-            await interaction.followup.send("⚠️ Ticket not found.", ephemeral=True)
+        if not await invalidate_issue_ticket(self.ticket_id, interaction.user.id, self.reason.value):
+            await interaction.followup.send("⚠️ Ticket not found or already closed.", ephemeral=True)
             return
 
-        ticket["status"] = "INVALID"
-        ticket["resolution"] = f"Marked as invalid: {self.reason.value}"
-        ticket["resolved_by"] = interaction.user.id
+        duplicate_index.remove(self.ticket_id)
 
-        save_issue_ticket(self.ticket_id, ticket)
+        ticket = await get_issue_ticket(self.ticket_id)
 
         await update_issue_transcript(
             self.bot,
@@ -589,19 +768,31 @@ class InvalidTicketModal(discord.ui.Modal, title="Mark as Invalid"):
 # Transcript View (Admin Actions)
 # =================================================
 
-class IssueTranscriptView(discord.ui.View):
+class IssueJumpThreadButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:issue_jump:(?P<ticket_id>ISS-\d+)|issue_jump_thread"
+):
     def __init__(self, ticket_id):
-        super().__init__(timeout=None)
+        super().__init__(
+            discord.ui.Button(
+                label="Jump to Thread",
+                style=discord.ButtonStyle.primary,
+                custom_id=f"cssbot:issue_jump:{ticket_id}" if ticket_id else "issue_jump_thread"
+            )
+        )
         self.ticket_id = ticket_id
 
-    @discord.ui.button(label="Jump to Thread", style=discord.ButtonStyle.primary, custom_id="issue_jump_thread")
-    async def jump_thread(self, interaction: discord.Interaction, button: discord.ui.Button):
-        ticket = get_issue_ticket(self.ticket_id)
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _transcript_ticket_id(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
+        ticket = await get_issue_ticket(self.ticket_id)
         if not ticket:
             await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
             return
 
-        thread = interaction.guild.get_thread(int(ticket["thread_id"]))
+        thread = interaction.guild.get_thread(int(ticket.thread_id))
         if not thread:
             await interaction.response.send_message("⚠️ Thread not found or archived.", ephemeral=True)
             return
@@ -611,9 +802,27 @@ class IssueTranscriptView(discord.ui.View):
             ephemeral=True
         )
 
-    @discord.ui.button(label="View Details", style=discord.ButtonStyle.secondary, custom_id="issue_view_details")
-    async def view_details(self, interaction: discord.Interaction, button: discord.ui.Button):
-        ticket = get_issue_ticket(self.ticket_id)
+
+class IssueViewDetailsButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:issue_details:(?P<ticket_id>ISS-\d+)|issue_view_details"
+):
+    def __init__(self, ticket_id):
+        super().__init__(
+            discord.ui.Button(
+                label="View Details",
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"cssbot:issue_details:{ticket_id}" if ticket_id else "issue_view_details"
+            )
+        )
+        self.ticket_id = ticket_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _transcript_ticket_id(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
+        ticket = await get_issue_ticket(self.ticket_id)
         if not ticket:
             await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
             return
@@ -624,25 +833,90 @@ class IssueTranscriptView(discord.ui.View):
             timestamp=datetime.utcnow()
         )
 
-        embed.add_field(name="Status", value=ticket["status"], inline=True)
-        embed.add_field(name="Category", value=ticket["category"], inline=True)
-        embed.add_field(name="Priority", value=ticket["priority"], inline=True)
-        embed.add_field(name="Created By", value=f"<@{ticket['created_by']}>", inline=True)
+        embed.add_field(name="Status", value=ticket.status, inline=True)
+        embed.add_field(name="Category", value=ticket.category, inline=True)
+        embed.add_field(name="Priority", value=ticket.priority, inline=True)
+        embed.add_field(name="Created By", value=f"<@{ticket.created_by}>", inline=True)
         
-        if ticket["claimed_by"]:
-            embed.add_field(name="Claimed By", value=f"<@{ticket['claimed_by']}>", inline=True)
+        if ticket.claimed_by:
+            embed.add_field(name="Claimed By", value=f"<@{ticket.claimed_by}>", inline=True)
         
-        if ticket["escalated"]:
-            embed.add_field(name="Escalated By", value=f"<@{ticket['escalated_by']}>", inline=True)
+        if ticket.escalated:
+            embed.add_field(name="Escalated By", value=f"<@{ticket.escalated_by}>", inline=True)
         
-        embed.add_field(name="Description", value=ticket["description"], inline=False)
+        embed.add_field(name="Description", value=ticket.description, inline=False)
         
-        if ticket.get("resolution"):
-            embed.add_field(name="Resolution", value=ticket["resolution"], inline=False)
+        if ticket.resolution:
+            embed.add_field(name="Resolution", value=ticket.resolution, inline=False)
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
+class IssueTranscriptView(discord.ui.View):
+    def __init__(self, ticket_id):
+        super().__init__(timeout=None)
+        self.ticket_id = ticket_id
+        self.add_item(IssueJumpThreadButton(ticket_id))
+        self.add_item(IssueViewDetailsButton(ticket_id))
+
+
+# =================================================
+# Search Results (For Mods)
+# =================================================
+
+SEARCH_PAGE_SIZE = 8
+
+
+class IssueSearchView(discord.ui.View):
+    """Prev/Next paging over /search_issues results"""
+
+    def __init__(self, query, hits, has_more, page=0):
+        super().__init__(timeout=300)
+        self.query = query
+        self.hits = hits
+        self.has_more = has_more
+        self.page = page
+        self._update_buttons()
+
+    @property
+    def embed(self):
+        embed = discord.Embed(
+            title=f"🔎 Issues matching \"{self.query}\"",
+            color=0x3498DB
+        )
+        if not self.hits:
+            embed.description = "No matching issue tickets."
+            return embed
+
+        for hit in self.hits:
+            created = hit.created_at.strftime("%Y-%m-%d") if hit.created_at else "?"
+            embed.add_field(
+                name=f"{hit.ticket_id} • {hit.status} • {hit.category} • {created}",
+                value=hit.snippet[:1000] or "—",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page + 1}")
+        return embed
+
+    def _update_buttons(self):
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = not self.has_more
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        self.hits, self.has_more = await search_issue_tickets(self.query, page, SEARCH_PAGE_SIZE)
+        self.page = page
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.embed, view=self)
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary, emoji="⬅️")
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, max(self.page - 1, 0))
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="➡️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page + 1)
+
+
 # =================================================
 # Entry Button for Users
 # =================================================
@@ -674,6 +948,29 @@ class IssueTickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        if config.DUPLICATE_THRESHOLD <= 0:
+            return
+
+        since = datetime.utcnow() - timedelta(hours=config.DUPLICATE_WINDOW_HOURS)
+        tickets = await get_active_issue_tickets_since(since)
+
+        def rebuild():
+            for ticket in tickets:
+                duplicate_index.add(
+                    ticket.id, ticket.description, ticket.reported_user, ticket.thread_id, ticket.created_at
+                )
+
+        # Hashing is CPU work; keep it off the event loop
+        await asyncio.to_thread(rebuild)
+        print(f"[IssueTickets] Duplicate index holds {len(duplicate_index)} open reports")
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        # Keeps the cached mod/admin lists current (lean gateway cache)
+        if before.roles != after.roles:
+            note_member_roles(after)
+
     @app_commands.command(
         name="setup_issue_reporter",
         description="Setup the issue reporting system in this channel"
@@ -705,21 +1002,130 @@ class IssueTickets(commands.Cog):
 
     @app_commands.command(
         name="export_issue_tickets",
-        description="Export all issue tickets as JSON for audit"
+        description="Export issue tickets as compressed NDJSON for audit"
     )
+    @app_commands.describe(
+        status="Only export tickets with this status",
+        since="Only tickets created on or after this date (YYYY-MM-DD)",
+        until="Only tickets created before this date (YYYY-MM-DD)",
+        include_archived="Also export closed tickets moved to the archive"
+    )
+    @app_commands.choices(status=[
+        app_commands.Choice(name=s, value=s)
+        for s in ["OPEN", "IN_PROGRESS", "ESCALATED", "RESOLVED", "INVALID"]
+    ])
     @app_commands.checks.has_permissions(administrator=True)
-    async def export_issue_tickets(self, interaction: discord.Interaction):
-        json_data = export_issue_tickets_json()
+    async def export_issue_tickets(
+        self,
+        interaction: discord.Interaction,
+        status: app_commands.Choice[str] = None,
+        since: str = None,
+        until: str = None,
+        include_archived: bool = False
+    ):
+        try:
+            since_dt, until_dt = parse_date(since), parse_date(until)
+        except ValueError:
+            await interaction.response.send_message("❌ Dates must be YYYY-MM-DD.", ephemeral=True)
+            return
 
-        fp = io.StringIO(json_data)
-        file = discord.File(fp, filename=f"issue_tickets_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json")
+        await interaction.response.defer(ephemeral=True)
 
-        await interaction.response.send_message(
-            content="📊 Issue ticket data export:",
-            file=file,
+        stamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        part_no = 0
+        async for part in iter_issue_ticket_export_parts(
+            status.value if status else None, since_dt, until_dt, include_archived
+        ):
+            part_no += 1
+            await interaction.followup.send(
+                content=f"📊 Issue ticket data export (part {part_no}):",
+                file=discord.File(part, filename=f"issue_tickets_{stamp}_part{part_no}.ndjson.gz"),
+                ephemeral=True
+            )
+
+    @app_commands.command(
+        name="claim_next_issue",
+        description="Claim the most urgent unclaimed issue ticket"
+    )
+    async def claim_next_issue(self, interaction: discord.Interaction):
+        mod_role = interaction.guild.get_role(config.MOD_ROLE_ID)
+        if mod_role not in interaction.user.roles and not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Moderators only.", ephemeral=True)
+            return
+
+        # Defer before claiming, so a slow claim cannot expire the interaction
+        await interaction.response.defer(ephemeral=True)
+
+        ticket_id = await claim_next_issue_ticket(interaction.user.id)
+        if not ticket_id:
+            await interaction.followup.send("📭 No unclaimed issue tickets.", ephemeral=True)
+            return
+
+        ticket = await record_issue_claim(interaction.client, ticket_id, interaction.user)
+
+        thread = interaction.guild.get_thread(ticket.thread_id) if ticket.thread_id else None
+        if thread:
+            try:
+                await thread.add_user(interaction.user)
+                await thread.send(
+                    f"✅ {interaction.user.mention} has claimed this ticket and is now handling it.",
+                    allowed_mentions=discord.AllowedMentions.none()
+                )
+            except discord.HTTPException:
+                pass
+
+        await interaction.followup.send(
+            f"✅ Claimed **{ticket_id}** ({ticket.priority} • {ticket.category})"
+            + (f"\nThread: {thread.mention}" if thread else ""),
             ephemeral=True
         )
 
+    @app_commands.command(
+        name="search_issues",
+        description="Full-text search over issue descriptions and resolutions"
+    )
+    @app_commands.describe(query="Words to search for, e.g. a username or topic")
+    async def search_issues(self, interaction: discord.Interaction, query: str):
+        mod_role = interaction.guild.get_role(config.MOD_ROLE_ID)
+        if mod_role not in interaction.user.roles and not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Moderators only.", ephemeral=True)
+            return
+
+        hits, has_more = await search_issue_tickets(query, 0, SEARCH_PAGE_SIZE)
+        view = IssueSearchView(query, hits, has_more)
+        await interaction.response.send_message(embed=view.embed, view=view, ephemeral=True)
+
+    @app_commands.command(
+        name="issue_history",
+        description="Show the event history of an issue ticket"
+    )
+    @app_commands.describe(ticket_id="Ticket ID, e.g. ISS-012")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def issue_history(self, interaction: discord.Interaction, ticket_id: str):
+        ticket_id = ticket_id.strip().upper()
+        if ticket_id.isdigit():
+            ticket_id = f"ISS-{int(ticket_id):03d}"
+
+        events = await get_ticket_events("issue", ticket_id)
+        if not events:
+            await interaction.response.send_message(f"❌ No history for {ticket_id}.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title=f"🕘 {ticket_id} History",
+            description=format_ticket_history(events),
+            color=0xE74C3C
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(bot):
+    bot.add_dynamic_items(
+        IssueClaimButton,
+        IssueEscalateButton,
+        IssueResolveButton,
+        IssueInvalidButton,
+        IssueJumpThreadButton,
+        IssueViewDetailsButton,
+    )
     await bot.add_cog(IssueTickets(bot))
\ No newline at end of file
@@ -1,18 +1,71 @@
 import discord
 from discord.ext import commands
+import asyncio
 import json
+from dataclasses import replace
 from datetime import datetime
-import io
 import config
 from discord import app_commands
 
-from services.database import (
+from services.repository import (
     get_ticket,
-    get_all_tickets,
+    find_ticket_id_by_transcript,
+    get_active_approval_message_ids,
     save_ticket,
+    get_groups_for_user,
+    get_pending_group_memberships,
+    record_approvals,
+    claim_ticket,
+    claim_next_ticket,
+    release_ticket,
+    set_approval_message,
+    cancel_ticket,
+    approve_ticket,
     next_ticket_id,
-    export_tickets_json,
+    iter_ticket_export_parts,
+    get_ticket_events,
+    subscribe_changes,
 )
+from services.records import StudyTicket
+from services.utils import parse_date, format_ticket_history, get_members, custom_id_ticket_id
+
+# Consent message IDs of tickets still awaiting approval. Lets
+# on_raw_reaction_add drop unrelated reactions without touching the DB.
+pending_approval_messages = set()
+
+
+class ApprovalBatcher:
+    """
+    Coalesces consent reactions per message.
+
+    The first reaction on a consent message opens a short window; every
+    reaction on that message arriving inside it is flushed together as one
+    database transaction.
+    """
+
+    def __init__(self, flush, window_seconds: float):
+        self._flush = flush
+        self.window = window_seconds
+        self._pending = {}
+        self._tasks = set()
+
+    def add(self, guild_id, message_id, user_id):
+        batch = self._pending.get(message_id)
+        if batch is None:
+            batch = self._pending[message_id] = set()
+            task = asyncio.create_task(self._drain(guild_id, message_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        batch.add(user_id)
+
+    async def _drain(self, guild_id, message_id):
+        await asyncio.sleep(self.window)
+        user_ids = self._pending.pop(message_id)
+        try:
+            await self._flush(guild_id, message_id, user_ids)
+        except Exception as e:
+            print(f"[Tickets] Error recording approvals on message {message_id}: {e}")
+
 
 # =================================================
 # Transcript helpers
@@ -29,12 +82,12 @@ async def post_transcript(bot, ticket_id, ticket):
         timestamp=datetime.utcnow()
     )
 
-    embed.add_field(name="Group Name", value=ticket["group_name"], inline=False)
-    embed.add_field(name="Level", value=ticket["level"], inline=True)
-    embed.add_field(name="Members Required", value=ticket["member_count"], inline=True)
+    embed.add_field(name="Group Name", value=ticket.group_name, inline=False)
+    embed.add_field(name="Level", value=ticket.level, inline=True)
+    embed.add_field(name="Members Required", value=ticket.member_count, inline=True)
     embed.add_field(
         name="Members",
-        value=" ".join(f"<@{u}>" for u in ticket["members"]),
+        value=" ".join(f"<@{u}>" for u in ticket.members),
         inline=False
     )
     embed.add_field(name="Status", value="🟢 OPEN", inline=True)
@@ -43,7 +96,7 @@ async def post_transcript(bot, ticket_id, ticket):
         embed=embed,
         view=TranscriptActionView(ticket_id)
     )
-    return str(msg.id)
+    return msg.id
 
 
 async def update_transcript(bot, ticket_id, ticket, status_text, reason=None):
@@ -53,19 +106,19 @@ async def update_transcript(bot, ticket_id, ticket, status_text, reason=None):
         return
 
     try:
-        msg = await channel.fetch_message(int(ticket["transcript_message_id"]))
+        msg = await channel.fetch_message(int(ticket.transcript_message_id))
     except (discord.NotFound, ValueError, TypeError):
         return
 
     embed = msg.embeds[0]
     embed.clear_fields()
 
-    embed.add_field(name="Group Name", value=ticket["group_name"], inline=False)
-    embed.add_field(name="Level", value=ticket["level"], inline=True)
-    embed.add_field(name="Members Required", value=ticket["member_count"], inline=True)
+    embed.add_field(name="Group Name", value=ticket.group_name, inline=False)
+    embed.add_field(name="Level", value=ticket.level, inline=True)
+    embed.add_field(name="Members Required", value=ticket.member_count, inline=True)
     embed.add_field(
         name="Members",
-        value=" ".join(f"<@{u}>" for u in ticket["members"]),
+        value=" ".join(f"<@{u}>" for u in ticket.members),
         inline=False
     )
     embed.add_field(name="Status", value=status_text, inline=True)
@@ -91,9 +144,9 @@ async def send_transcript_dm(bot, user_id, ticket_id, ticket, status_text, reaso
             timestamp=datetime.utcnow()
         )
         
-        embed.add_field(name="Group Name", value=ticket["group_name"], inline=False)
-        embed.add_field(name="Level", value=ticket["level"], inline=True)
-        embed.add_field(name="Members", value=" ".join(f"<@{u}>" for u in ticket["members"]), inline=False)
+        embed.add_field(name="Group Name", value=ticket.group_name, inline=False)
+        embed.add_field(name="Level", value=ticket.level, inline=True)
+        embed.add_field(name="Members", value=" ".join(f"<@{u}>" for u in ticket.members), inline=False)
         embed.add_field(name="Final Status", value=status_text, inline=True)
         
         if reason:
@@ -126,14 +179,7 @@ async def create_ticket_channel(guild, ticket_id, ticket, admin):
 
     overwrites[admin] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
 
-    for uid in ticket["members"]:
-        member = guild.get_member(uid)
-        if not member:
-            try:
-                member = await guild.fetch_member(uid)
-            except discord.NotFound:
-                continue
-
+    for member in (await get_members(guild, ticket.members)).values():
         overwrites[member] = discord.PermissionOverwrite(
             view_channel=True,
             send_messages=True
@@ -149,16 +195,20 @@ async def create_ticket_channel(guild, ticket_id, ticket, admin):
         reason=f"Study group ticket {ticket_id}"
     )
 
-    consent = await channel.send(
-        "🔔 **Consent Required**\n\n"
-        "All listed members must react with ✅ to confirm participation:\n\n"
-        + " ".join(f"<@{u}>" for u in ticket["members"])
-    )
-    await consent.add_reaction("✅")
+    try:
+        consent = await channel.send(
+            "🔔 **Consent Required**\n\n"
+            "All listed members must react with ✅ to confirm participation:\n\n"
+            + " ".join(f"<@{u}>" for u in ticket.members)
+        )
+        await consent.add_reaction("✅")
+    except discord.HTTPException:
+        await channel.delete(reason=f"Study group ticket {ticket_id} setup failed")
+        raise
 
     print(f"[Tickets] Created consent message with ID: {consent.id}")
     
-    return channel, str(consent.id)
+    return channel, consent.id
 
 
 # =================================================
@@ -182,16 +232,21 @@ class CancellationReasonModal(discord.ui.Modal, title="Ticket Cancellation"):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
-        ticket = get_ticket(self.ticket_id)
+        ticket = await get_ticket(self.ticket_id)
         if not ticket:
             await interaction.followup.send("⚠️ Ticket not found.", ephemeral=True)
             return
 
-        # Update ticket with cancellation details
-        ticket["status"] = "CANCELLED"
-        ticket["cancelled_by"] = interaction.user.id
-        ticket["cancelled_at"] = datetime.utcnow().isoformat()
-        ticket["cancellation_reason"] = self.reason.value
+        if not await cancel_ticket(self.ticket_id, interaction.user.id, self.reason.value):
+            await interaction.followup.send(
+                f"⚠️ Cannot cancel a ticket that is already {ticket.status}.",
+                ephemeral=True
+            )
+            return
+
+        pending_approval_messages.discard(ticket.approval_message_id)
+
+        ticket = await get_ticket(self.ticket_id)
 
         # Delete ticket channel if it exists
         guild = interaction.guild
@@ -202,9 +257,6 @@ class CancellationReasonModal(discord.ui.Modal, title="Ticket Cancellation"):
             except discord.NotFound:
                 pass
 
-        # Save to database
-        save_ticket(self.ticket_id, ticket)
-
         # Update transcript with reason
         await update_transcript(
             self.bot,
@@ -217,7 +269,7 @@ class CancellationReasonModal(discord.ui.Modal, title="Ticket Cancellation"):
         # Send DM to ticket creator
         await send_transcript_dm(
             self.bot,
-            ticket["created_by"],
+            ticket.created_by,
             self.ticket_id,
             ticket,
             "CANCELLED",
@@ -236,78 +288,119 @@ class CancellationReasonModal(discord.ui.Modal, title="Ticket Cancellation"):
 # Transcript action (Claim + Cancel)
 # =================================================
 
-class TranscriptActionView(discord.ui.View):
+async def start_claimed_ticket(interaction, ticket_id):
+    """
+    Side effects of a won claim: ticket channel, consent message, transcript.
+
+    If the channel cannot be created the claim is released, so the ticket
+    goes back to OPEN instead of staying CLAIMED with no channel.
+    """
+    ticket = await get_ticket(ticket_id)
+
+    try:
+        channel, approval_msg_id = await create_ticket_channel(
+            interaction.guild, ticket_id, ticket, interaction.user
+        )
+    except Exception:
+        await release_ticket(ticket_id, interaction.user.id)
+        await interaction.followup.send(
+            f"❌ Could not create the channel for ticket #{ticket_id}; it is open again.",
+            ephemeral=True
+        )
+        raise
+
+    await set_approval_message(ticket_id, approval_msg_id)
+    pending_approval_messages.add(approval_msg_id)
+
+    print(f"[Tickets] Ticket {ticket_id} claimed by {interaction.user.id}")
+
+    await update_transcript(
+        interaction.client,
+        ticket_id,
+        ticket,
+        f"🟡 CLAIMED by <@{interaction.user.id}>"
+    )
+    return channel
+
+
+async def _transcript_ticket_id(interaction, match):
+    return await custom_id_ticket_id(match, find_ticket_id_by_transcript, interaction.message.id)
+
+
+class ClaimTicketButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:claim:(?P<ticket_id>\d+)|cssbot_claim_ticket"
+):
     def __init__(self, ticket_id):
-        super().__init__(timeout=None)
+        super().__init__(
+            discord.ui.Button(
+                label="Claim",
+                style=discord.ButtonStyle.primary,
+                emoji="🛠️",
+                custom_id=f"cssbot:claim:{ticket_id}" if ticket_id else "cssbot_claim_ticket"
+            )
+        )
         self.ticket_id = ticket_id
 
-    @discord.ui.button(
-        label="Claim",
-        style=discord.ButtonStyle.primary,
-        emoji="🛠️",
-        custom_id="cssbot_claim_ticket"
-    )
-    async def claim(self, interaction: discord.Interaction, button: discord.ui.Button):
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _transcript_ticket_id(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
         # Check permissions first (before deferring)
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("❌ Admins only.", ephemeral=True)
             return
 
-        ticket = get_ticket(self.ticket_id)
+        # Defer before claiming so a slow claim cannot outlive the interaction
+        await interaction.response.defer(ephemeral=True)
 
-        if not ticket or ticket["status"] != "OPEN":
-            await interaction.response.send_message("⚠️ Ticket unavailable.", ephemeral=True)
+        # Only one admin can win the OPEN -> CLAIMED transition
+        if not self.ticket_id or not await claim_ticket(self.ticket_id, interaction.user.id):
+            await interaction.followup.send("⚠️ Ticket unavailable.", ephemeral=True)
             return
 
-        # NOW defer (we passed all checks)
-        await interaction.response.defer(ephemeral=True)
-
-        ticket["status"] = "CLAIMED"
-        ticket["claimed_by"] = interaction.user.id
+        channel = await start_claimed_ticket(interaction, self.ticket_id)
 
-        channel, approval_msg_id = await create_ticket_channel(
-            interaction.guild, self.ticket_id, ticket, interaction.user
+        await interaction.followup.send(
+            f"✅ Ticket claimed. Channel created: {channel.mention}",
+            ephemeral=True
         )
 
-        ticket["approval_message_id"] = approval_msg_id
-        ticket["approved_members"] = []
 
-        save_ticket(self.ticket_id, ticket)
-        
-        print(f"[Tickets] Ticket {self.ticket_id} claimed by {interaction.user.id}")
-
-        await update_transcript(
-            interaction.client,
-            self.ticket_id,
-            ticket,
-            f"🟡 CLAIMED by <@{interaction.user.id}>"
+class CancelTicketButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cssbot:cancel:(?P<ticket_id>\d+)|cssbot_cancel_ticket"
+):
+    def __init__(self, ticket_id):
+        super().__init__(
+            discord.ui.Button(
+                label="Cancel",
+                style=discord.ButtonStyle.danger,
+                emoji="❌",
+                custom_id=f"cssbot:cancel:{ticket_id}" if ticket_id else "cssbot_cancel_ticket"
+            )
         )
+        self.ticket_id = ticket_id
 
-        await interaction.followup.send(
-            f"✅ Ticket claimed. Channel created: {channel.mention}",
-            ephemeral=True
-        )
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(await _transcript_ticket_id(interaction, match))
 
-    @discord.ui.button(
-        label="Cancel",
-        style=discord.ButtonStyle.danger,
-        emoji="❌",
-        custom_id="cssbot_cancel_ticket"
-    )
-    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def callback(self, interaction: discord.Interaction):
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("❌ Admins only.", ephemeral=True)
             return
 
-        ticket = get_ticket(self.ticket_id)
+        ticket = await get_ticket(self.ticket_id) if self.ticket_id else None
 
         if not ticket:
             await interaction.response.send_message("⚠️ Ticket not found.", ephemeral=True)
             return
 
-        if ticket["status"] in ["CANCELLED", "APPROVED"]:
+        if ticket.status in ["CANCELLED", "APPROVED"]:
             await interaction.response.send_message(
-                f"⚠️ Cannot cancel a ticket that is already {ticket['status']}.",
+                f"⚠️ Cannot cancel a ticket that is already {ticket.status}.",
                 ephemeral=True
             )
             return
@@ -317,6 +410,63 @@ class TranscriptActionView(discord.ui.View):
             CancellationReasonModal(self.ticket_id, interaction.client)
         )
 
+
+class TranscriptActionView(discord.ui.View):
+    def __init__(self, ticket_id):
+        super().__init__(timeout=None)
+        self.ticket_id = ticket_id
+        self.add_item(ClaimTicketButton(ticket_id))
+        self.add_item(CancelTicketButton(ticket_id))
+
+# =================================================
+# My Groups
+# =================================================
+
+MY_GROUPS_PAGE_SIZE = 10
+
+
+class MyGroupsView(discord.ui.View):
+    """Prev/Next paging over a user's /my_groups list"""
+
+    def __init__(self, groups, page=0):
+        super().__init__(timeout=300)
+        self.groups = groups
+        self.pages = (len(groups) + MY_GROUPS_PAGE_SIZE - 1) // MY_GROUPS_PAGE_SIZE
+        self.page = page
+        self._update_buttons()
+
+    @property
+    def embed(self):
+        embed = discord.Embed(title="📘 Your Study Groups", color=0x2B6CB0)
+        start = self.page * MY_GROUPS_PAGE_SIZE
+        for group in self.groups[start:start + MY_GROUPS_PAGE_SIZE]:
+            consent = " • ✅ consented" if group["approved"] and group["status"] == "CLAIMED" else ""
+            embed.add_field(
+                name=f"#{group['ticket_id']} — {group['group_name']}",
+                value=f"{group['level']} • {group['status']}{consent}",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page + 1} of {self.pages} • {len(self.groups)} groups")
+        return embed
+
+    def _update_buttons(self):
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        self.page = page
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.embed, view=self)
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary, emoji="⬅️")
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, max(self.page - 1, 0))
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="➡️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, min(self.page + 1, self.pages - 1))
+
+
 # =================================================
 # Cog + reaction approval
 # =================================================
@@ -324,91 +474,179 @@ class TranscriptActionView(discord.ui.View):
 class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.approvals = ApprovalBatcher(
+            self.flush_approvals,
+            config.APPROVAL_BATCH_WINDOW_MS / 1000
+        )
+
+    async def cog_load(self):
+        pending_approval_messages.clear()
+        pending_approval_messages.update(await get_active_approval_message_ids())
+        print(f"[Tickets] Tracking {len(pending_approval_messages)} pending consent messages")
+        subscribe_changes(self.on_remote_change)
+
+    async def on_remote_change(self, kind, ticket_id):
+        """Pick up consent messages posted by another bot instance"""
+        if kind not in (None, "study"):
+            return
+        if ticket_id is None:
+            pending_approval_messages.update(await get_active_approval_message_ids())
+            return
+
+        # Stale entries are harmless: record_approvals finds no ticket and
+        # flush_approvals drops them
+        ticket = await get_ticket(ticket_id)
+        if ticket and ticket.status == "CLAIMED" and ticket.approval_message_id:
+            pending_approval_messages.add(ticket.approval_message_id)
 
     @app_commands.command(
         name="export_tickets",
-        description="Export all study group tickets as JSON for audit"
+        description="Export study group tickets as compressed NDJSON for audit"
+    )
+    @app_commands.describe(
+        status="Only export tickets with this status",
+        since="Only tickets created on or after this date (YYYY-MM-DD)",
+        until="Only tickets created before this date (YYYY-MM-DD)",
+        include_archived="Also export closed tickets moved to the archive"
     )
+    @app_commands.choices(status=[
+        app_commands.Choice(name=s, value=s)
+        for s in ["OPEN", "CLAIMED", "APPROVED", "CANCELLED"]
+    ])
     @app_commands.checks.has_permissions(administrator=True)
-    async def export_tickets(self, interaction: discord.Interaction):
-        json_data = export_tickets_json()
+    async def export_tickets(
+        self,
+        interaction: discord.Interaction,
+        status: app_commands.Choice[str] = None,
+        since: str = None,
+        until: str = None,
+        include_archived: bool = False
+    ):
+        try:
+            since_dt, until_dt = parse_date(since), parse_date(until)
+        except ValueError:
+            await interaction.response.send_message("❌ Dates must be YYYY-MM-DD.", ephemeral=True)
+            return
 
-        fp = io.StringIO(json_data)
-        file = discord.File(fp, filename=f"tickets_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json")
+        await interaction.response.defer(ephemeral=True)
 
-        await interaction.response.send_message(
-            content="📊 Ticket data export:",
-            file=file,
+        stamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        part_no = 0
+        async for part in iter_ticket_export_parts(
+            status.value if status else None, since_dt, until_dt, include_archived
+        ):
+            part_no += 1
+            await interaction.followup.send(
+                content=f"📊 Ticket data export (part {part_no}):",
+                file=discord.File(part, filename=f"tickets_{stamp}_part{part_no}.ndjson.gz"),
+                ephemeral=True
+            )
+
+    @app_commands.command(
+        name="claim_next",
+        description="Claim the oldest open study group request"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def claim_next(self, interaction: discord.Interaction):
+        # Defer before claiming: a claim whose follow-up never runs would
+        # leave the ticket CLAIMED with no channel, out of the queue for good
+        await interaction.response.defer(ephemeral=True)
+
+        ticket_id = await claim_next_ticket(interaction.user.id)
+        if not ticket_id:
+            await interaction.followup.send("📭 No open study group requests.", ephemeral=True)
+            return
+
+        channel = await start_claimed_ticket(interaction, ticket_id)
+
+        await interaction.followup.send(
+            f"✅ Claimed ticket #{ticket_id}. Channel created: {channel.mention}",
             ephemeral=True
         )
 
+    @app_commands.command(
+        name="ticket_history",
+        description="Show the event history of a study group ticket"
+    )
+    @app_commands.describe(ticket_id="Ticket ID, e.g. 07")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def ticket_history(self, interaction: discord.Interaction, ticket_id: str):
+        ticket_id = ticket_id.strip().lstrip("#")
+        if ticket_id.isdigit():
+            ticket_id = f"{int(ticket_id):02d}"
+
+        events = await get_ticket_events("study", ticket_id)
+        if not events:
+            await interaction.response.send_message(f"❌ No history for ticket #{ticket_id}.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title=f"🕘 Ticket #{ticket_id} History",
+            description=format_ticket_history(events),
+            color=0x2B6CB0
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(
+        name="my_groups",
+        description="List the study groups you are part of"
+    )
+    async def my_groups(self, interaction: discord.Interaction):
+        groups = await get_groups_for_user(interaction.user.id)
+
+        if not groups:
+            await interaction.response.send_message(
+                "You are not part of any study group yet.",
+                ephemeral=True
+            )
+            return
+
+        view = MyGroupsView(groups)
+        if view.pages > 1:
+            await interaction.response.send_message(embed=view.embed, view=view, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=view.embed, ephemeral=True)
+
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
         if payload.emoji.name != "✅":
             return
         if payload.user_id == self.bot.user.id:
             return
+        if payload.message_id not in pending_approval_messages:
+            return
 
-        print(f"[Tickets] Reaction detected: User {payload.user_id} on message {payload.message_id}")
+        self.approvals.add(payload.guild_id, payload.message_id, payload.user_id)
 
-        all_tickets = get_all_tickets()
-        
-        print(f"[Tickets] Total tickets in DB: {len(all_tickets)}")
-
-        for ticket_id, ticket in all_tickets.items():
-            approval_msg_id = ticket.get("approval_message_id")
-            
-            print(f"[Tickets] Checking ticket {ticket_id}: approval_message_id = {approval_msg_id}, payload.message_id = {payload.message_id}")
-            
-            if str(approval_msg_id) != str(payload.message_id):
-                continue
-
-            print(f"[Tickets] Match found! Ticket {ticket_id}")
-
-            if payload.user_id not in ticket["members"]:
-                print(f"[Tickets] User {payload.user_id} not in ticket members: {ticket['members']}")
-                return
-            
-            current_approved = ticket.get("approved_members", [])
-            print(f"[Tickets] Current approved members: {current_approved}")
-            
-            if payload.user_id in current_approved:
-                print(f"[Tickets] User {payload.user_id} already approved")
-                return
-
-            if "approved_members" not in ticket:
-                ticket["approved_members"] = []
-            
-            ticket["approved_members"].append(payload.user_id)
-            
-            save_ticket(ticket_id, ticket)
-            
-            saved_ticket = get_ticket(ticket_id)
-            print(f"[Tickets] After save - approved_members from DB: {saved_ticket.get('approved_members')}")
-
-            if set(ticket["approved_members"]) == set(ticket["members"]):
-                print(f"[Tickets] All members approved! Finalizing...")
-                await self.finalize_ticket(payload.guild_id, ticket_id)
-            else:
-                print(f"[Tickets] Waiting for more approvals: {len(ticket['approved_members'])}/{len(ticket['members'])}")
+    async def flush_approvals(self, guild_id, message_id, user_ids):
+        result = await record_approvals(message_id, user_ids)
+        if result is None:
+            pending_approval_messages.discard(message_id)
+            return
 
+        ticket_id, remaining = result
+        if remaining:
+            print(f"[Tickets] Ticket {ticket_id}: {remaining} approval(s) outstanding")
             return
-        
-        print(f"[Tickets] No matching ticket found for message {payload.message_id}")
+
+        print(f"[Tickets] All members approved ticket {ticket_id}. Finalizing...")
+        await self.finalize_ticket(guild_id, ticket_id)
 
     async def finalize_ticket(self, guild_id, ticket_id):
-        ticket = get_ticket(ticket_id)
+        ticket = await get_ticket(ticket_id)
         if not ticket:
             print(f"[Tickets] Ticket {ticket_id} not found during finalization")
             return
 
+        pending_approval_messages.discard(ticket.approval_message_id)
+
+        # CLAIMED -> APPROVED succeeds once, so finalization never runs twice
+        if not await approve_ticket(ticket_id):
+            return
+
         print(f"[Tickets] Finalizing ticket {ticket_id}")
-        
-        ticket["status"] = "APPROVED"
-        ticket["approved_members"] = []
-        ticket["approval_message_id"] = None
 
-        save_ticket(ticket_id, ticket)
+        ticket = await get_ticket(ticket_id)
 
         await update_transcript(
             self.bot,
@@ -420,7 +658,7 @@ class Tickets(commands.Cog):
         # Send DM to ticket creator
         await send_transcript_dm(
             self.bot,
-            ticket["created_by"],
+            ticket.created_by,
             ticket_id,
             ticket,
             "APPROVED"
@@ -434,7 +672,7 @@ class Tickets(commands.Cog):
 
             # Create role and voice channel
             role = await create_study_role(guild, ticket)
-            await assign_role_to_members(guild, role, ticket["members"])
+            await assign_role_to_members(guild, role, ticket.members)
             await create_private_voice_channel(guild, role, ticket)
         
         print(f"[Tickets] Ticket {ticket_id} finalized successfully")
@@ -445,7 +683,7 @@ class Tickets(commands.Cog):
 # =================================================
 
 async def create_study_role(guild, ticket):
-    role_name = f"SG_{ticket['group_name']}"
+    role_name = f"SG_{ticket.group_name}"
 
     existing = discord.utils.get(guild.roles, name=role_name)
     if existing:
@@ -454,20 +692,13 @@ async def create_study_role(guild, ticket):
     role = await guild.create_role(
         name=role_name,
         mentionable=False,
-        reason=f"Study group approved ({ticket['group_name']})"
+        reason=f"Study group approved ({ticket.group_name})"
     )
     return role
 
 
 async def assign_role_to_members(guild, role, member_ids):
-    for uid in member_ids:
-        member = guild.get_member(uid)
-        if not member:
-            try:
-                member = await guild.fetch_member(uid)
-            except discord.NotFound:
-                continue
-
+    for member in (await get_members(guild, member_ids)).values():
         await member.add_roles(
             role,
             reason="Study group approved"
@@ -491,7 +722,7 @@ async def create_private_voice_channel(guild, role, ticket):
         )
 
     channel = await guild.create_voice_channel(
-        name=f"SG_{ticket['group_name']}",
+        name=f"SG_{ticket.group_name}",
         overwrites=overwrites,
         category=discord.utils.get(
             guild.categories,
@@ -574,29 +805,33 @@ class StudyGroupFormView(discord.ui.View):
             await interaction.response.send_message("❌ Invalid submission.", ephemeral=True)
             return
 
-        tid = next_ticket_id()
+        already_pending = await get_pending_group_memberships(self.members)
+        if already_pending:
+            await interaction.response.send_message(
+                "❌ These members already have a pending study group request:\n"
+                + "\n".join(f"<@{uid}> — Ticket #{tid}" for uid, tid in already_pending.items()),
+                ephemeral=True
+            )
+            return
+
+        tid = await next_ticket_id()
 
-        ticket = {
-            "group_name": self.group_name,
-            "level": self.level,
-            "member_count": self.member_count,
-            "members": self.members,
-            "created_by": self.creator.id,
-            "status": "OPEN",
-            "claimed_by": None,
-            "cancelled_by": None,
-            "cancelled_at": None,
-            "cancellation_reason": None,
-            "approval_message_id": None,
-            "approved_members": [],
-            "transcript_message_id": None,
-        }
+        ticket = StudyTicket(
+            id=tid,
+            group_name=self.group_name,
+            level=self.level,
+            member_count=self.member_count,
+            members=tuple(self.members),
+            created_by=self.creator.id,
+            status="OPEN",
+        )
 
-        ticket["transcript_message_id"] = await post_transcript(
-            interaction.client, tid, ticket
+        ticket = replace(
+            ticket,
+            transcript_message_id=await post_transcript(interaction.client, tid, ticket)
         )
 
-        save_ticket(tid, ticket)
+        await save_ticket(ticket)
 
         await interaction.response.edit_message(
             embed=discord.Embed(
@@ -682,4 +917,5 @@ class TicketEntryView(discord.ui.View):
 # =================================================
 
 async def setup(bot):
+    bot.add_dynamic_items(ClaimTicketButton, CancelTicketButton)
     await bot.add_cog(Tickets(bot))
\ No newline at end of file
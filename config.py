@@ -9,6 +9,10 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 # Optional: restrict to one server later
 GUILD_ID = os.getenv("GUILD_ID")  # string, cast later if used
 
+# Sync slash commands to GUILD_ID only (shows up instantly) instead of
+# globally. Either way a sync only happens when the commands changed.
+COMMAND_SYNC_GUILD = os.getenv("COMMAND_SYNC_GUILD", "false").lower() == "true"
+
 # Variables for SG ticketing system
 STUDY_GROUP_REQUEST_CHANNEL_ID = int(os.getenv("STUDY_GROUP_REQUEST_CHANNEL_ID"))
 TRANSCRIPTS_CHANNEL_ID = int(os.getenv("TRANSCRIPTS_CHANNEL_ID"))
@@ -31,6 +35,85 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 STATE_FILE = os.path.join(DATA_DIR, "state.json")
 
+# --- Database ---
+# Optional read replica for exports, listings and startup scans
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+# Connection pool (per engine)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Postgres only: abort any statement running longer than this (0 = no limit)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+# SQLite only (local / single-node installs)
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+# Minutes between WAL checkpoints (0 = leave it to SQLite's auto-checkpoint)
+SQLITE_CHECKPOINT_MINUTES = int(os.getenv("SQLITE_CHECKPOINT_MINUTES", "10"))
+
+# Worker threads used to run blocking database calls off the event loop
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "4"))
+
+# Ticket IDs reserved per counter round trip. Values above 1 make bursts
+# cheaper but leave gaps in the numbering when the bot restarts.
+TICKET_ID_BLOCK_SIZE = int(os.getenv("TICKET_ID_BLOCK_SIZE", "1"))
+
+# In-process ticket cache (entries per ticket type, seconds). Size 0 disables it.
+# Writes from other bot processes are pushed through the invalidation bus,
+# so the TTL is only a safety net.
+TICKET_CACHE_SIZE = int(os.getenv("TICKET_CACHE_SIZE", "512"))
+TICKET_CACHE_TTL = int(os.getenv("TICKET_CACHE_TTL", "3600"))
+
+# Cross-instance cache invalidation (Postgres LISTEN/NOTIFY, SQLite polling)
+CACHE_INVALIDATION = os.getenv("CACHE_INVALIDATION", "true").lower() == "true"
+INVALIDATION_POLL_SECONDS = float(os.getenv("INVALIDATION_POLL_SECONDS", "1"))
+
+# Online database snapshots (SQLite backup API / pg_dump), compressed.
+# BACKUP_INTERVAL_HOURS 0 disables the schedule; /backup_now still works.
+BACKUP_DIR = os.getenv("BACKUP_DIR", "data/backups")
+BACKUP_INTERVAL_HOURS = int(os.getenv("BACKUP_INTERVAL_HOURS", "24"))
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+
+# --- Tickets ---
+# Consent reactions arriving within this window are written in one batch
+APPROVAL_BATCH_WINDOW_MS = int(os.getenv("APPROVAL_BATCH_WINDOW_MS", "25"))
+
+# How often counter changes are folded into the /ticket_stats rollups
+STATS_FOLD_SECONDS = int(os.getenv("STATS_FOLD_SECONDS", "60"))
+
+# Largest export attachment; bigger exports are split into several files
+EXPORT_PART_MAX_BYTES = int(os.getenv("EXPORT_PART_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# New issue reports at least this similar (0-1) to an open one from the
+# last DUPLICATE_WINDOW_HOURS are added to its thread instead. 0 disables.
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.5"))
+DUPLICATE_WINDOW_HOURS = int(os.getenv("DUPLICATE_WINDOW_HOURS", "72"))
+
+# Tickets closed more than this many days ago are moved to the archive
+# table by a daily job. Exports can still include them; /search_issues and
+# the ticket buttons only see live tables. 0 disables the job.
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "365"))
+
+# --- Gateway cache ---
+# "full": every guild member is cached and guilds are chunked at login, so
+# member lookups are free but memory grows with the server. "lean": only
+# voice-connected members are cached; ticket flows fetch the members they
+# need on demand, costing a gateway round trip per lookup instead.
+GATEWAY_CACHE_PROFILE = os.getenv("GATEWAY_CACHE_PROFILE", "full").lower()
+# Lean profile: how often the mod/admin member lists used for issue threads
+# are reloaded in full (role changes seen by the bot apply immediately)
+ROLE_MEMBER_REFRESH_MINUTES = int(os.getenv("ROLE_MEMBER_REFRESH_MINUTES", "60"))
+# Recent messages kept in memory (the bot only uses raw events, so this can stay small)
+MESSAGE_CACHE_SIZE = int(os.getenv(
+    "MESSAGE_CACHE_SIZE", "1000" if GATEWAY_CACHE_PROFILE == "full" else "100"
+))
+
 # --- Bot Behaviour ---
 BOT_NAME = "CSSBot"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
\ No newline at end of file
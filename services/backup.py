@@ -0,0 +1,121 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import config
+
+# =================================================
+# Online Backups
+# =================================================
+# SQLite: the online backup API copies BACKUP_PAGES_PER_STEP pages at a
+# time from a separate connection and sleeps between steps, so writers
+# only ever wait for one short step (and not at all under WAL). The copy
+# is then gzipped.
+#
+# PostgreSQL: pg_dump in custom format (already compressed), which reads
+# from a single consistent snapshot without blocking writers.
+#
+# Both are blocking and can take a while, so callers run them on their own
+# thread rather than the database executor. Snapshots older than the
+# newest BACKUP_KEEP are deleted.
+
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP = 0.005
+
+_running = threading.Lock()
+
+
+def _stamp() -> str:
+    return datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+
+
+def _backup_sqlite(engine, backup_dir: str) -> str:
+    stamp = _stamp()
+    tmp_path = os.path.join(backup_dir, f".tickets_{stamp}.db.tmp")
+    path = os.path.join(backup_dir, f"tickets_{stamp}.db.gz")
+
+    source = sqlite3.connect(engine.url.database)
+    dest = sqlite3.connect(tmp_path)
+    try:
+        source.backup(dest, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        dest.close()
+        source.close()
+
+    try:
+        with open(tmp_path, "rb") as raw, gzip.open(path, "wb", compresslevel=6) as out:
+            shutil.copyfileobj(raw, out, 1024 * 1024)
+    finally:
+        os.remove(tmp_path)
+    return path
+
+
+def _backup_postgres(engine, backup_dir: str) -> str:
+    if not shutil.which("pg_dump"):
+        raise RuntimeError("pg_dump is not installed on this host")
+
+    path = os.path.join(backup_dir, f"tickets_{_stamp()}.dump")
+    url = engine.url.set(drivername="postgresql")
+
+    # Password goes through the environment, not the process arguments
+    env = dict(os.environ)
+    if url.password:
+        env["PGPASSWORD"] = url.password
+    dsn = url.set(password=None).render_as_string(hide_password=False)
+
+    result = subprocess.run(
+        ["pg_dump", "--format=custom", "--no-owner", f"--file={path}", f"--dbname={dsn}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        if os.path.exists(path):
+            os.remove(path)
+        raise RuntimeError(f"pg_dump failed: {result.stderr.strip()[:500]}")
+    return path
+
+
+def _rotate(backup_dir: str, keep: int):
+    snapshots = sorted(
+        name for name in os.listdir(backup_dir)
+        if name.startswith("tickets_") and (name.endswith(".db.gz") or name.endswith(".dump"))
+    )
+    for name in snapshots[:-keep] if keep > 0 else []:
+        os.remove(os.path.join(backup_dir, name))
+
+
+def backup_database(engine) -> dict:
+    """
+    Write one compressed snapshot and rotate old ones.
+
+    Returns {"path", "size_bytes", "seconds"}. Raises RuntimeError if a
+    backup is already running or the dump fails.
+    """
+    if not _running.acquire(blocking=False):
+        raise RuntimeError("A backup is already running")
+
+    try:
+        os.makedirs(config.BACKUP_DIR, exist_ok=True)
+        start = time.perf_counter()
+
+        if engine.dialect.name == "sqlite":
+            path = _backup_sqlite(engine, config.BACKUP_DIR)
+        elif engine.dialect.name == "postgresql":
+            path = _backup_postgres(engine, config.BACKUP_DIR)
+        else:
+            raise RuntimeError(f"Backups are not supported for {engine.dialect.name}")
+
+        _rotate(config.BACKUP_DIR, config.BACKUP_KEEP)
+        return {
+            "path": path,
+            "size_bytes": os.path.getsize(path),
+            "seconds": time.perf_counter() - start,
+        }
+    finally:
+        _running.release()
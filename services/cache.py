@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TicketCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+
+    Values are shared, not copied, so only store immutable objects
+    (the frozen ticket records).
+
+    Readers that fill the cache after a miss take a token() before
+    reading the database and pass it to put(). If the key was
+    invalidated in between, the value they read may predate the write
+    that invalidated it, and the put is dropped.
+    """
+
+    # Per-key generations kept before they are reset wholesale
+    MAX_GENERATIONS = 10000
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generations = {}  # key -> times invalidated
+        self._epoch = 0  # bumped by clear() and generation resets
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def token(self, key):
+        """Snapshot to pass to put() when filling the cache from a read"""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def put(self, key, value, token=None):
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            if token is not None and token != (self._epoch, self._generations.get(key, 0)):
+                return  # invalidated since the read started
+
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._generations) >= self.MAX_GENERATIONS:
+                self._generations.clear()
+                self._epoch += 1
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,17 +1,48 @@
 import os
 import json
-from datetime import datetime
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
 
 from sqlalchemy import (
     create_engine,
+    event,
+    select,
+    func,
+    case,
+    inspect,
+    text,
+    update,
+    delete,
+    insert,
     Column,
     Integer,
     String,
     Text,
     DateTime,
     Boolean,
+    ForeignKey,
+    Index,
 )
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import config
+from services.cache import TicketCache
+from services.migrations import run_migrations
+from services.stats import (
+    creation_deltas,
+    transition_deltas,
+    merge_deltas,
+    study_ticket_deltas,
+    issue_ticket_deltas,
+)
+from services.search import create_issue_search, search_issue_tickets as _search_issue_tickets
+from services.invalidation import InvalidationBus
+from services.records import StudyTicket, IssueTicketRecord, TicketEventRecord, IssueSearchHit
 
 Base = declarative_base()
 
@@ -23,23 +54,52 @@ class Ticket(Base):
     __tablename__ = "tickets"
 
     id = Column(String, primary_key=True)
+    number = Column(Integer, unique=True, index=True)  # integer form of id, for ordering
     group_name = Column(String, nullable=False)
     level = Column(String, nullable=False)
     member_count = Column(Integer, nullable=False)
     members = Column(Text, nullable=False)
-    created_by = Column(String, nullable=False)
+    created_by = Column(String, nullable=False, index=True)
 
-    status = Column(String, nullable=False)
+    status = Column(String, nullable=False, index=True)
     claimed_by = Column(String, nullable=True)
     cancelled_by = Column(String, nullable=True)
     cancelled_at = Column(DateTime, nullable=True)
     cancellation_reason = Column(Text, nullable=True)
 
-    approval_message_id = Column(String, nullable=True)
+    approval_message_id = Column(String, nullable=True, index=True)
     approved_members = Column(Text, nullable=True)
-    transcript_message_id = Column(String, nullable=True)
+    transcript_message_id = Column(String, nullable=True, index=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    member_rows = relationship(
+        "TicketMember",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="TicketMember.position",
+    )
+
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+class TicketMember(Base):
+    """One row per (ticket, member); indexed by user for membership lookups"""
+    __tablename__ = "ticket_members"
+
+    ticket_id = Column(String, ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String, primary_key=True, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    approved = Column(Boolean, nullable=False, default=False)
+
+
+# Study group statuses that still count as an open request
+PENDING_TICKET_STATUSES = ("OPEN", "CLAIMED")
+
+# Issue ticket statuses that can still change
+ACTIVE_ISSUE_STATUSES = ("OPEN", "IN_PROGRESS", "ESCALATED")
+
+# Final statuses; only these are ever moved to the archive
+CLOSED_TICKET_STATUSES = ("APPROVED", "CANCELLED")
+CLOSED_ISSUE_STATUSES = ("RESOLVED", "INVALID")
 
 
 class TicketCounter(Base):
@@ -57,15 +117,16 @@ class IssueTicket(Base):
     __tablename__ = "issue_tickets"
 
     id = Column(String, primary_key=True)  # ISS-001, ISS-002, etc.
+    number = Column(Integer, unique=True, index=True)  # 1, 2, etc.
     category = Column(String, nullable=False)
     priority = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     
-    created_by = Column(String, nullable=False)
+    created_by = Column(String, nullable=False, index=True)
     anonymous = Column(Boolean, default=False)
     reported_user = Column(String, nullable=True)
     
-    status = Column(String, nullable=False)  # OPEN, IN_PROGRESS, ESCALATED, RESOLVED, INVALID
+    status = Column(String, nullable=False, index=True)  # OPEN, IN_PROGRESS, ESCALATED, RESOLVED, INVALID
     claimed_by = Column(String, nullable=True)
     escalated = Column(Boolean, default=False)
     escalated_by = Column(String, nullable=True)
@@ -74,10 +135,18 @@ class IssueTicket(Base):
     resolved_by = Column(String, nullable=True)
     resolved_at = Column(DateTime, nullable=True)
     
-    thread_id = Column(String, nullable=True)
-    transcript_message_id = Column(String, nullable=True)
+    thread_id = Column(String, nullable=True, index=True)
+    transcript_message_id = Column(String, nullable=True, index=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+# Fresh databases get the search index alongside the table (see services/search.py)
+event.listen(
+    IssueTicket.__table__,
+    "after_create",
+    lambda target, connection, **kw: create_issue_search(connection),
+)
 
 
 class IssueTicketCounter(Base):
@@ -87,10 +156,139 @@ class IssueTicketCounter(Base):
     last_issue_id = Column(Integer, default=0)
 
 
+# =================================================
+# Ticket Event Log
+# =================================================
+
+class TicketEvent(Base):
+    """Append-only audit trail for both ticket systems"""
+    __tablename__ = "ticket_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticket_kind = Column(String, nullable=False)  # "study" or "issue"
+    ticket_id = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # CREATED, CLAIMED, APPROVED, ...
+    actor_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    payload = Column(Text, nullable=True)  # small JSON object
+
+    __table_args__ = (
+        Index("ix_ticket_events_ticket", "ticket_kind", "ticket_id", "id"),
+    )
+
+
+_TICKET_KINDS = {"tickets": "study", "issue_tickets": "issue"}
+
+
+def _log_event(session, model, ticket_id: str, event_type: str, actor_id=None, payload: dict = None):
+    """Append an event in the caller's transaction"""
+    session.add(TicketEvent(
+        ticket_kind=_TICKET_KINDS[model.__tablename__],
+        ticket_id=ticket_id,
+        event_type=event_type,
+        actor_id=str(actor_id) if actor_id is not None else None,
+        created_at=datetime.utcnow(),
+        payload=json.dumps(payload) if payload else None,
+    ))
+
+
+# =================================================
+# Ticket Archive
+# =================================================
+
+class TicketArchive(Base):
+    """Closed tickets moved out of the hot tables by the retention job"""
+    __tablename__ = "ticket_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticket_kind = Column(String, nullable=False)  # "study" or "issue"
+    ticket_id = Column(String, nullable=False)
+    number = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    payload = Column(Text, nullable=False)  # export record (to_dict) as JSON
+
+    __table_args__ = (
+        Index("ix_ticket_archive_ticket", "ticket_kind", "ticket_id", unique=True),
+        Index("ix_ticket_archive_number", "ticket_kind", "number"),
+    )
+
+
+# =================================================
+# Cache Invalidation Log (SQLite)
+# =================================================
+
+class CacheInvalidation(Base):
+    """Change log polled by other instances (see services/invalidation.py)"""
+    __tablename__ = "cache_invalidations"
+    # Pollers track the highest id they have seen, so ids must never be
+    # reused once old rows are pruned (plain SQLite rowids would be)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    instance_id = Column(String, nullable=False)
+    kind = Column(String, nullable=True)
+    ticket_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+# =================================================
+# Ticket Statistics
+# =================================================
+
+class TicketStat(Base):
+    """Rollup counters behind /ticket_stats (see services/stats.py)"""
+    __tablename__ = "ticket_stats"
+
+    kind = Column(String, primary_key=True)  # "study" or "issue"
+    metric = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class TicketStatDelta(Base):
+    """Counter changes not yet folded into ticket_stats (insert-only)"""
+    __tablename__ = "ticket_stat_deltas"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    metric = Column(String, nullable=False)
+    bucket = Column(String, nullable=False)
+    delta = Column(Integer, nullable=False)
+
+
+def _bump_stats(session, model, deltas):
+    """
+    Record counter deltas in the caller's transaction.
+
+    Deltas are appended to ticket_stat_deltas rather than upserted into
+    ticket_stats, so concurrent transitions never wait on the same hot
+    counter row (status/OPEN and friends). fold_ticket_stats moves them
+    into ticket_stats periodically.
+    """
+    deltas = merge_deltas(deltas)
+    if not deltas:
+        return
+
+    kind = _TICKET_KINDS[model.__tablename__]
+    session.execute(insert(TicketStatDelta), [
+        {"kind": kind, "metric": metric, "bucket": bucket, "delta": delta}
+        for metric, bucket, delta in deltas
+    ])
+
+
 # =================================================
 # Database Connection
 # =================================================
 
+def _normalize_url(url: str) -> str:
+    # Railway hands out postgres://, SQLAlchemy wants postgresql://
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
@@ -100,20 +298,192 @@ if not DATABASE_URL:
     
 elif DATABASE_URL.startswith("postgres://"):
     # PRODUCTION: Fix Railway's postgres:// to postgresql://
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    DATABASE_URL = _normalize_url(DATABASE_URL)
     print("[Database] Using PostgreSQL (Railway)")
 
 else:
     print(f"[Database] Using: {DATABASE_URL.split('@')[0]}@***")
 
+
+class _PoolWaitStats:
+    """Running totals of how long pool checkouts waited for a connection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times, for sizing the pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = _PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+def _apply_sqlite_profile(dbapi_connection, connection_record):
+    """Per-connection PRAGMAs for the local SQLite profile"""
+    cursor = dbapi_connection.cursor()
+    try:
+        if config.SQLITE_WAL:
+            # Readers never block the writer, and commits append to the WAL
+            # instead of rewriting pages, so NORMAL sync is crash-safe here
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _create_engine(url: str):
+    """Create an engine with the pool settings from config"""
+    options = {
+        "poolclass": _TimedQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+    if url.startswith("postgresql") and config.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    new_engine = create_engine(url, **options)
+    if url.startswith("sqlite"):
+        event.listen(new_engine, "connect", _apply_sqlite_profile)
+    return new_engine
+
+
 # Create engine
-engine = create_engine(DATABASE_URL)
+engine = _create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine)
 
+# Read-only paths (exports, listings, startup scans) can go to a replica.
+# Without DATABASE_READ_URL they share the primary engine.
+if config.DATABASE_READ_URL:
+    read_engine = _create_engine(_normalize_url(config.DATABASE_READ_URL))
+    print("[Database] Routing read-only queries to the read replica")
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(bind=read_engine)
+
+
+def checkpoint_wal():
+    """
+    Fold the SQLite WAL back into the main database file.
+
+    PASSIVE mode never waits on readers or writers. Returns
+    (busy, wal_pages, checkpointed_pages), or None when not on SQLite WAL.
+    """
+    if engine.dialect.name != "sqlite" or not config.SQLITE_WAL:
+        return None
+    with engine.connect() as conn:
+        return tuple(conn.execute(text("PRAGMA wal_checkpoint(PASSIVE)")).one())
+
+
+def get_pool_stats() -> dict:
+    """Pool occupancy and checkout wait times per engine"""
+    stats = {}
+    for name, eng in (("primary", engine), ("replica", read_engine)):
+        if name == "replica" and eng is engine:
+            continue
+        stats[name] = {
+            "status": eng.pool.status(),
+            **eng.pool.wait_stats.snapshot(),
+        }
+    return stats
+
+
+# Rows fetched per round trip when streaming exports
+EXPORT_PAGE_SIZE = 500
+
+# Write-through caches in front of get_ticket / get_issue_ticket.
+# The database stays the source of truth; every save refreshes the entry.
+_ticket_cache = TicketCache(config.TICKET_CACHE_SIZE, config.TICKET_CACHE_TTL)
+_issue_ticket_cache = TicketCache(config.TICKET_CACHE_SIZE, config.TICKET_CACHE_TTL)
+
+
+_bus = InvalidationBus(engine, config.INVALIDATION_POLL_SECONDS)
+_change_subscribers = []
+
+
+def _publish(session, model, ticket_id):
+    """Tell other instances to drop ticket_id, in the caller's transaction"""
+    if config.CACHE_INVALIDATION:
+        kind = _TICKET_KINDS[model.__tablename__] if model is not None else None
+        _bus.publish(session.connection(), kind, ticket_id)
+
+
+def _on_remote_change(kind, ticket_id):
+    """Invalidation from another instance (runs on the listener thread)"""
+    for cache_kind, cache in (("study", _ticket_cache), ("issue", _issue_ticket_cache)):
+        if kind in (None, cache_kind):
+            if ticket_id is None:
+                cache.clear()
+            else:
+                cache.invalidate(ticket_id)
+
+    for callback in _change_subscribers:
+        try:
+            callback(kind, ticket_id)
+        except Exception as e:
+            print(f"[Database] Change subscriber failed: {e}")
+
+
+def subscribe_changes(callback):
+    """
+    Call callback(kind, ticket_id) for every change made by another
+    instance. It runs on the listener thread and must not block.
+    """
+    _change_subscribers.append(callback)
+
+
+def start_cache_listener():
+    """Start receiving other instances' invalidations"""
+    if config.CACHE_INVALIDATION:
+        _bus.start(_on_remote_change)
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters for the ticket caches"""
+    return {
+        "tickets": _ticket_cache.stats(),
+        "issue_tickets": _issue_ticket_cache.stats(),
+    }
+
 
 def init_db():
-    """Initialize database tables and counters"""
+    """Initialize database tables, apply migrations and set up counters"""
+    fresh = not inspect(engine).has_table(Ticket.__tablename__)
     Base.metadata.create_all(engine)
+    run_migrations(engine, fresh=fresh)
     session = SessionLocal()
     try:
         # Study group ticket counter
@@ -127,111 +497,540 @@ def init_db():
             session.add(IssueTicketCounter(last_issue_id=0))
             session.commit()
             print("[Database] Initialized issue ticket counter")
+
+        if engine.dialect.name == "postgresql":
+            _ticket_ids.prepare_sequence(session)
+            _issue_ticket_ids.prepare_sequence(session)
+            session.commit()
+
+        # Populate ticket_members for tickets created before the table existed
+        if not session.query(TicketMember).first() and session.query(Ticket).first():
+            for t in session.query(Ticket).all():
+                _sync_ticket_members(
+                    t,
+                    json.loads(t.members),
+                    json.loads(t.approved_members) if t.approved_members else [],
+                )
+            session.commit()
+            print("[Database] Backfilled ticket members")
+    finally:
+        session.close()
+
+
+# =================================================
+# Ticket ID Allocation
+# =================================================
+
+class _IdAllocator:
+    """
+    Hands out ticket numbers without a read-modify-write of the counter row.
+
+    Postgres reserves numbers from a sequence; SQLite uses an atomic
+    UPDATE ... RETURNING on the counter row. Each round trip reserves
+    block_size numbers, which are then handed out from memory.
+    """
+
+    def __init__(self, counter_column, sequence_name: str, block_size: int):
+        self.counter_column = counter_column
+        self.sequence_name = sequence_name
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        self._next = 1
+        self._end = 0
+
+    def next(self) -> int:
+        with self._lock:
+            if self._next > self._end:
+                self._end = self._reserve_block()
+                self._next = self._end - self.block_size + 1
+            value = self._next
+            self._next += 1
+            return value
+
+    def _reserve_block(self) -> int:
+        """Reserve the next block of numbers and return the last one"""
+        session = SessionLocal()
+        try:
+            if engine.dialect.name == "postgresql":
+                end = session.execute(text(f"SELECT nextval('{self.sequence_name}')")).scalar()
+            else:
+                end = session.execute(
+                    update(self.counter_column.class_)
+                    .values({self.counter_column: self.counter_column + self.block_size})
+                    .returning(self.counter_column)
+                ).scalar()
+            session.commit()
+            return end
+        finally:
+            session.close()
+
+    def prepare_sequence(self, session):
+        """Create the Postgres sequence and align it with the legacy counter row"""
+        seq = self.sequence_name
+        session.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {seq} MINVALUE 0 START WITH 0"))
+        session.execute(text(f"ALTER SEQUENCE {seq} INCREMENT BY {self.block_size}"))
+
+        last_value, is_called = session.execute(text(f"SELECT last_value, is_called FROM {seq}")).one()
+        counter = session.query(self.counter_column).scalar() or 0
+        if not is_called or counter > last_value:
+            session.execute(text("SELECT setval(:seq, :value, true)"), {"seq": seq, "value": counter})
+
+    def last_reserved(self, session) -> int:
+        """Highest number handed out or reserved so far"""
+        if engine.dialect.name == "postgresql":
+            last_value, is_called = session.execute(
+                text(f"SELECT last_value, is_called FROM {self.sequence_name}")
+            ).one()
+            return last_value if is_called else 0
+        return session.query(self.counter_column).scalar() or 0
+
+
+_ticket_ids = _IdAllocator(TicketCounter.last_ticket_id, "ticket_id_seq", config.TICKET_ID_BLOCK_SIZE)
+_issue_ticket_ids = _IdAllocator(IssueTicketCounter.last_issue_id, "issue_ticket_id_seq", config.TICKET_ID_BLOCK_SIZE)
+
+
+# =================================================
+# Conditional State Transitions
+# =================================================
+
+def _apply_transition(session, model, ticket_id: str, from_statuses, values: dict, *conditions,
+                      event=None, released_by=None) -> bool:
+    """
+    Apply a state change with a conditional UPDATE in the caller's session.
+
+    Only rows still in one of from_statuses (and matching any extra
+    conditions) are changed, so concurrent handlers cannot both win.
+    Each source status is tried in turn so the winner knows which status
+    it left, and the stats counters and the optional event - an
+    (event_type, actor_id, payload) tuple - are written in the same
+    transaction. released_by names the claimer whose claim a move back
+    to OPEN undoes. Returns True if this call performed the transition.
+    """
+    won = None
+    for status in from_statuses:
+        won = session.execute(
+            update(model)
+            .where(model.id == ticket_id, model.status == status, *conditions)
+            .values(**values)
+            .returning(model.created_at)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if won:
+            break
+
+    if won:
+        _bump_stats(session, model, transition_deltas(
+            status, values.get("status"), won.created_at,
+            released_by if released_by is not None else values.get("claimed_by")
+        ))
+        if event:
+            _log_event(session, model, ticket_id, *event)
+        _publish(session, model, ticket_id)
+    return won is not None
+
+
+def _transition(model, cache, ticket_id: str, from_statuses, values: dict, *conditions,
+                event=None, released_by=None) -> bool:
+    """Run _apply_transition in its own transaction"""
+    session = SessionLocal()
+    try:
+        won = _apply_transition(
+            session, model, ticket_id, from_statuses, values, *conditions,
+            event=event, released_by=released_by
+        )
+        session.commit()
+        return won
     finally:
+        cache.invalidate(ticket_id)
         session.close()
 
 
+# Candidates tried per /claim_next on SQLite, where a concurrent claim can
+# take the row between picking it and updating it
+CLAIM_NEXT_ATTEMPTS = 5
+
+
+def _claim_next(model, cache, from_statuses, order_by, values: dict, *conditions, event=None):
+    """
+    Claim the first ticket in order_by that is still claimable.
+
+    Postgres picks the row with FOR UPDATE SKIP LOCKED, so concurrent
+    callers each lock a different ticket and never wait on one another.
+    SQLite has no row locks; the conditional UPDATE decides, and a caller
+    that loses simply moves on to the next candidate.
+    Returns the claimed ticket ID, or None if the queue is empty.
+    """
+    for _ in range(CLAIM_NEXT_ATTEMPTS):
+        session = SessionLocal()
+        ticket_id = None
+        try:
+            query = (
+                select(model.id)
+                .where(model.status.in_(from_statuses), *conditions)
+                .order_by(*order_by)
+                .limit(1)
+            )
+            if engine.dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+
+            ticket_id = session.execute(query).scalar()
+            if ticket_id is None:
+                return None
+
+            if _apply_transition(session, model, ticket_id, from_statuses, values, *conditions, event=event):
+                session.commit()
+                return ticket_id
+            session.rollback()
+        finally:
+            if ticket_id is not None:
+                cache.invalidate(ticket_id)
+            session.close()
+    return None
+
+
 # =================================================
 # Study Group Ticket Functions (existing)
 # =================================================
 
-def _ticket_to_dict(t: Ticket):
-    """Convert Ticket model to dictionary"""
-    return {
-        "group_name": t.group_name,
-        "level": t.level,
-        "member_count": t.member_count,
-        "members": json.loads(t.members),
-        "created_by": t.created_by,
-        "status": t.status,
-        "claimed_by": t.claimed_by,
-        "cancelled_by": t.cancelled_by,
-        "cancelled_at": t.cancelled_at.isoformat() if t.cancelled_at else None,
-        "cancellation_reason": t.cancellation_reason,
-        "approval_message_id": t.approval_message_id,
-        "approved_members": json.loads(t.approved_members) if t.approved_members else [],
-        "transcript_message_id": t.transcript_message_id,
-    }
+def _int(value):
+    return int(value) if value is not None else None
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+def _to_study_ticket(t: Ticket) -> StudyTicket:
+    """Convert Ticket row to a StudyTicket record"""
+    return StudyTicket(
+        id=t.id,
+        group_name=t.group_name,
+        level=t.level,
+        member_count=t.member_count,
+        members=tuple(int(m.user_id) for m in t.member_rows),
+        created_by=int(t.created_by),
+        status=t.status,
+        claimed_by=_int(t.claimed_by),
+        cancelled_by=_int(t.cancelled_by),
+        cancelled_at=t.cancelled_at,
+        cancellation_reason=t.cancellation_reason,
+        approval_message_id=_int(t.approval_message_id),
+        approved_members=tuple(int(m.user_id) for m in t.member_rows if m.approved),
+        transcript_message_id=_int(t.transcript_message_id),
+        created_at=t.created_at,
+    )
+
+
+def _sync_ticket_members(t: Ticket, members, approved_members):
+    """Make t.member_rows match the given member and approval lists"""
+    approved = {str(uid) for uid in approved_members}
+    existing = {m.user_id: m for m in t.member_rows}
+    wanted = [str(uid) for uid in members]
+
+    for position, uid in enumerate(wanted):
+        row = existing.get(uid)
+        if not row:
+            row = TicketMember(user_id=uid)
+            t.member_rows.append(row)
+        row.position = position
+        row.approved = uid in approved
+
+    for uid, row in existing.items():
+        if uid not in wanted:
+            t.member_rows.remove(row)
 
 
 def get_ticket(ticket_id: str):
     """Get a single ticket by ID"""
+    cached = _ticket_cache.get(ticket_id)
+    if cached is not None:
+        return cached
+
+    # Taken before the read: a write committed meanwhile invalidates the
+    # key and the possibly stale row is not cached
+    token = _ticket_cache.token(ticket_id)
     session = SessionLocal()
     try:
         t = session.query(Ticket).filter_by(id=ticket_id).first()
-        return _ticket_to_dict(t) if t else None
+        if not t:
+            return None
+        ticket = _to_study_ticket(t)
+        _ticket_cache.put(ticket_id, ticket, token)
+        return ticket
+    finally:
+        session.close()
+
+
+def find_ticket_id_by_transcript(message_id: int):
+    """ID of the ticket whose admin transcript is message_id, or None"""
+    session = ReadSessionLocal()
+    try:
+        return session.scalar(
+            select(Ticket.id).where(Ticket.transcript_message_id == str(message_id))
+        )
     finally:
         session.close()
 
 
-def save_ticket(ticket_id: str, data: dict):
+def save_ticket(ticket: StudyTicket):
     """Save or update a ticket"""
     session = SessionLocal()
     try:
-        t = session.query(Ticket).filter_by(id=ticket_id).first()
+        t = session.query(Ticket).filter_by(id=ticket.id).first()
         if not t:
-            t = Ticket(id=ticket_id, created_by=str(data["created_by"]))
+            t = Ticket(id=ticket.id, number=int(ticket.id), created_by=str(ticket.created_by))
             session.add(t)
+            _log_event(session, Ticket, ticket.id, "CREATED", ticket.created_by)
+            deltas = creation_deltas(ticket.status, datetime.utcnow(), level=ticket.level)
+        else:
+            deltas = transition_deltas(t.status, ticket.status, t.created_at)
 
-        t.group_name = data["group_name"]
-        t.level = data["level"]
-        t.member_count = data["member_count"]
-        t.members = json.dumps(data["members"])
-        t.status = data["status"]
-        t.claimed_by = str(data["claimed_by"]) if data.get("claimed_by") else None
-        t.cancelled_by = str(data["cancelled_by"]) if data.get("cancelled_by") else None
-        t.cancelled_at = (
-            datetime.fromisoformat(data["cancelled_at"])
-            if data.get("cancelled_at")
-            else None
-        )
-        t.cancellation_reason = data.get("cancellation_reason")
-        t.approval_message_id = (
-            str(data["approval_message_id"]) if data.get("approval_message_id") else None
-        )
-        t.approved_members = json.dumps(data.get("approved_members", []))
-        t.transcript_message_id = (
-            str(data["transcript_message_id"]) if data.get("transcript_message_id") else None
-        )
+        t.group_name = ticket.group_name
+        t.level = ticket.level
+        t.member_count = ticket.member_count
+        t.members = json.dumps(list(ticket.members))
+        t.status = ticket.status
+        t.claimed_by = _str(ticket.claimed_by)
+        t.cancelled_by = _str(ticket.cancelled_by)
+        t.cancelled_at = ticket.cancelled_at
+        t.cancellation_reason = ticket.cancellation_reason
+        t.approval_message_id = _str(ticket.approval_message_id)
+        t.approved_members = json.dumps(list(ticket.approved_members))
+        t.transcript_message_id = _str(ticket.transcript_message_id)
+        _sync_ticket_members(t, ticket.members, ticket.approved_members)
 
+        session.flush()
+        _bump_stats(session, Ticket, deltas)
+        _publish(session, Ticket, ticket.id)
+        saved = _to_study_ticket(t)
         session.commit()
+        _ticket_cache.put(ticket.id, saved)
+        return saved
+    except Exception:
+        _ticket_cache.invalidate(ticket.id)
+        raise
     finally:
         session.close()
 
 
 def get_all_tickets():
-    """Get all tickets as a dictionary"""
+    """Get all tickets, oldest first"""
+    session = ReadSessionLocal()
+    try:
+        tickets = session.query(Ticket).order_by(Ticket.number).all()
+        return [_to_study_ticket(t) for t in tickets]
+    finally:
+        session.close()
+
+
+def get_active_approval_message_ids() -> set:
+    """Get consent message IDs of all tickets still awaiting approval"""
+    session = ReadSessionLocal()
+    try:
+        rows = (
+            session.query(Ticket.approval_message_id)
+            .filter(Ticket.approval_message_id.isnot(None))
+            .all()
+        )
+        return {int(row[0]) for row in rows}
+    finally:
+        session.close()
+
+
+def get_groups_for_user(user_id: int):
+    """Get every study group ticket a user is a member of"""
+    session = ReadSessionLocal()
+    try:
+        rows = (
+            session.query(Ticket.id, Ticket.group_name, Ticket.level, Ticket.status, TicketMember.approved)
+            .join(TicketMember, TicketMember.ticket_id == Ticket.id)
+            .filter(TicketMember.user_id == str(user_id))
+            .order_by(Ticket.number)
+            .all()
+        )
+        return [
+            {
+                "ticket_id": row.id,
+                "group_name": row.group_name,
+                "level": row.level,
+                "status": row.status,
+                "approved": row.approved,
+            }
+            for row in rows
+        ]
+    finally:
+        session.close()
+
+
+def get_pending_group_memberships(user_ids) -> dict:
+    """Map each given user already in an open/claimed ticket to that ticket ID"""
     session = SessionLocal()
     try:
-        tickets = session.query(Ticket).all()
-        return {t.id: _ticket_to_dict(t) for t in tickets}
+        rows = (
+            session.query(TicketMember.user_id, Ticket.id)
+            .join(Ticket, TicketMember.ticket_id == Ticket.id)
+            .filter(TicketMember.user_id.in_([str(uid) for uid in user_ids]))
+            .filter(Ticket.status.in_(PENDING_TICKET_STATUSES))
+            .all()
+        )
+        return {int(user_id): ticket_id for user_id, ticket_id in rows}
     finally:
         session.close()
 
 
-def next_ticket_id() -> str:
-    """Get next ticket ID and increment counter"""
+def record_approvals(approval_message_id, user_ids):
+    """
+    Mark members of the ticket behind a consent message as approved.
+
+    Runs as one transaction for a whole batch of reactions. Each approval
+    is a per-row flag flip, so concurrent batches never lose each other's
+    updates, and non-members simply match no rows. Returns
+    (ticket_id, remaining_unapproved), or None if no claimed ticket uses
+    that consent message.
+    """
     session = SessionLocal()
     try:
-        counter = session.query(TicketCounter).first()
-        counter.last_ticket_id += 1
+        # Lock the ticket row so concurrent batches for one ticket run one
+        # after another and exactly one of them sees remaining == 0
+        ticket_id = (
+            session.query(Ticket.id)
+            .filter(Ticket.approval_message_id == str(approval_message_id))
+            .filter(Ticket.status == "CLAIMED")
+            .with_for_update()
+            .scalar()
+        )
+        if not ticket_id:
+            return None
+
+        consented = session.execute(
+            update(TicketMember)
+            .where(
+                TicketMember.ticket_id == ticket_id,
+                TicketMember.user_id.in_([str(uid) for uid in user_ids]),
+                TicketMember.approved.is_(False),
+            )
+            .values(approved=True)
+            .returning(TicketMember.user_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        for user_id in consented:
+            _log_event(session, Ticket, ticket_id, "CONSENTED", user_id)
+        if consented:
+            _publish(session, Ticket, ticket_id)
+
+        remaining = (
+            session.query(func.count())
+            .select_from(TicketMember)
+            .filter(TicketMember.ticket_id == ticket_id, TicketMember.approved.is_(False))
+            .scalar()
+        )
         session.commit()
-        return f"{counter.last_ticket_id:02d}"
+        _ticket_cache.invalidate(ticket_id)
+        return ticket_id, remaining
     finally:
         session.close()
 
 
-def export_tickets_json() -> str:
-    """Export all tickets as JSON for audit purposes"""
-    session = SessionLocal()
+def claim_ticket(ticket_id: str, admin_id: int) -> bool:
+    """OPEN -> CLAIMED. Returns False if someone else got there first."""
+    return _transition(
+        Ticket, _ticket_cache, ticket_id, ("OPEN",),
+        {"status": "CLAIMED", "claimed_by": str(admin_id)},
+        event=("CLAIMED", admin_id, None),
+    )
+
+
+def claim_next_ticket(admin_id: int):
+    """Claim the oldest OPEN study ticket. Returns its ID, or None if none are open."""
+    return _claim_next(
+        Ticket, _ticket_cache, ("OPEN",), (Ticket.number,),
+        {"status": "CLAIMED", "claimed_by": str(admin_id)},
+        event=("CLAIMED", admin_id, None),
+    )
+
+
+def release_ticket(ticket_id: str, admin_id: int) -> bool:
+    """CLAIMED -> OPEN, for a claim by admin_id whose ticket channel could not be set up"""
+    return _transition(
+        Ticket, _ticket_cache, ticket_id, ("CLAIMED",),
+        {"status": "OPEN", "claimed_by": None, "approval_message_id": None},
+        Ticket.claimed_by == str(admin_id),
+        event=("RELEASED", admin_id, None),
+        released_by=admin_id,
+    )
+
+
+def set_approval_message(ticket_id: str, message_id):
+    """Attach the consent message of a claimed ticket"""
+    _transition(
+        Ticket, _ticket_cache, ticket_id, ("CLAIMED",),
+        {"approval_message_id": str(message_id)},
+        event=("CONSENT_REQUESTED", None, {"message_id": str(message_id)}),
+    )
+
+
+def cancel_ticket(ticket_id: str, cancelled_by: int, reason: str) -> bool:
+    """OPEN/CLAIMED -> CANCELLED"""
+    return _transition(
+        Ticket, _ticket_cache, ticket_id, PENDING_TICKET_STATUSES,
+        {
+            "status": "CANCELLED",
+            "cancelled_by": str(cancelled_by),
+            "cancelled_at": datetime.utcnow(),
+            "cancellation_reason": reason,
+            "approval_message_id": None,
+        },
+        event=("CANCELLED", cancelled_by, {"reason": reason}),
+    )
+
+
+def approve_ticket(ticket_id: str) -> bool:
+    """CLAIMED -> APPROVED. Only one caller ever gets True."""
+    return _transition(
+        Ticket, _ticket_cache, ticket_id, ("CLAIMED",),
+        {"status": "APPROVED", "approval_message_id": None},
+        event=("APPROVED", None, None),
+    )
+
+
+def next_ticket_id() -> str:
+    """Allocate the next ticket ID"""
+    return f"{_ticket_ids.next():02d}"
+
+
+def iter_ticket_export(status: str = None, since: datetime = None, until: datetime = None,
+                       include_archived: bool = False):
+    """
+    Yield tickets as export records, oldest first.
+
+    The first record carries export metadata; rows are streamed from the
+    database in pages so the full table is never loaded at once. With
+    include_archived, archived tickets (all older) come before live ones.
+    """
+    session = ReadSessionLocal()
     try:
-        counter = session.query(TicketCounter).first()
-        tickets = get_all_tickets()
-        data = {
-            "last_ticket_id": counter.last_ticket_id if counter else 0,
-            "tickets": tickets,
+        yield {
+            "export": "tickets",
+            "exported_at": datetime.utcnow().isoformat(),
+            "last_ticket_id": _ticket_ids.last_reserved(session),
+            "include_archived": include_archived,
         }
-        return json.dumps(data, indent=2)
+
+        if include_archived:
+            yield from _iter_archive(session, "study", status, since, until)
+
+        query = select(Ticket).order_by(Ticket.number)
+        if status:
+            query = query.where(Ticket.status == status)
+        if since:
+            query = query.where(Ticket.created_at >= since)
+        if until:
+            query = query.where(Ticket.created_at < until)
+
+        rows = session.execute(query.execution_options(yield_per=EXPORT_PAGE_SIZE)).scalars()
+        for t in rows:
+            yield _to_study_ticket(t).to_dict()
+            session.expunge(t)
     finally:
         session.close()
 
@@ -240,126 +1039,686 @@ def export_tickets_json() -> str:
 # Issue Ticket Functions (NEW)
 # =================================================
 
-def _issue_ticket_to_dict(t: IssueTicket):
-    """Convert IssueTicket model to dictionary"""
-    return {
-        "category": t.category,
-        "priority": t.priority,
-        "description": t.description,
-        "created_by": t.created_by,
-        "anonymous": t.anonymous,
-        "reported_user": t.reported_user,
-        "status": t.status,
-        "claimed_by": t.claimed_by,
-        "escalated": t.escalated,
-        "escalated_by": t.escalated_by,
-        "resolution": t.resolution,
-        "resolved_by": t.resolved_by,
-        "resolved_at": t.resolved_at.isoformat() if t.resolved_at else None,
-        "thread_id": t.thread_id,
-        "transcript_message_id": t.transcript_message_id,
-        "created_at": t.created_at.isoformat() if t.created_at else None,
-    }
+def _to_issue_record(t: IssueTicket) -> IssueTicketRecord:
+    """Convert IssueTicket row to an IssueTicketRecord"""
+    return IssueTicketRecord(
+        id=t.id,
+        category=t.category,
+        priority=t.priority,
+        description=t.description,
+        created_by=int(t.created_by),
+        status=t.status,
+        anonymous=bool(t.anonymous),
+        reported_user=_int(t.reported_user),
+        claimed_by=_int(t.claimed_by),
+        escalated=bool(t.escalated),
+        escalated_by=_int(t.escalated_by),
+        resolution=t.resolution,
+        resolved_by=_int(t.resolved_by),
+        resolved_at=t.resolved_at,
+        thread_id=_int(t.thread_id),
+        transcript_message_id=_int(t.transcript_message_id),
+        created_at=t.created_at,
+    )
 
 
 def get_issue_ticket(ticket_id: str):
     """Get a single issue ticket by ID"""
+    cached = _issue_ticket_cache.get(ticket_id)
+    if cached is not None:
+        return cached
+
+    # Taken before the read: a write committed meanwhile invalidates the
+    # key and the possibly stale row is not cached
+    token = _issue_ticket_cache.token(ticket_id)
     session = SessionLocal()
     try:
         t = session.query(IssueTicket).filter_by(id=ticket_id).first()
-        return _issue_ticket_to_dict(t) if t else None
+        if not t:
+            return None
+        ticket = _to_issue_record(t)
+        _issue_ticket_cache.put(ticket_id, ticket, token)
+        return ticket
     finally:
         session.close()
 
 
-def save_issue_ticket(ticket_id: str, data: dict):
+def save_issue_ticket(ticket: IssueTicketRecord):
     """Save or update an issue ticket"""
     session = SessionLocal()
     try:
-        t = session.query(IssueTicket).filter_by(id=ticket_id).first()
+        t = session.query(IssueTicket).filter_by(id=ticket.id).first()
         if not t:
-            t = IssueTicket(id=ticket_id)
+            t = IssueTicket(id=ticket.id, number=int(ticket.id.split("-")[1]))
             session.add(t)
+            _log_event(session, IssueTicket, ticket.id, "CREATED", ticket.created_by)
+            deltas = creation_deltas(
+                ticket.status, ticket.created_at or datetime.utcnow(),
+                category=ticket.category, priority=ticket.priority,
+            )
+        else:
+            deltas = transition_deltas(t.status, ticket.status, t.created_at)
 
-        t.category = data["category"]
-        t.priority = data["priority"]
-        t.description = data["description"]
-        t.created_by = str(data["created_by"])
-        t.anonymous = data.get("anonymous", False)
-        t.reported_user = str(data["reported_user"]) if data.get("reported_user") else None
-        t.status = data["status"]
-        t.claimed_by = str(data["claimed_by"]) if data.get("claimed_by") else None
-        t.escalated = data.get("escalated", False)
-        t.escalated_by = str(data["escalated_by"]) if data.get("escalated_by") else None
-        t.resolution = data.get("resolution")
-        t.resolved_by = str(data["resolved_by"]) if data.get("resolved_by") else None
-        t.resolved_at = (
-            datetime.fromisoformat(data["resolved_at"])
-            if data.get("resolved_at")
-            else None
-        )
-        t.thread_id = str(data["thread_id"]) if data.get("thread_id") else None
-        t.transcript_message_id = (
-            str(data["transcript_message_id"]) if data.get("transcript_message_id") else None
-        )
+        t.category = ticket.category
+        t.priority = ticket.priority
+        t.description = ticket.description
+        t.created_by = str(ticket.created_by)
+        t.anonymous = ticket.anonymous
+        t.reported_user = _str(ticket.reported_user)
+        t.status = ticket.status
+        t.claimed_by = _str(ticket.claimed_by)
+        t.escalated = ticket.escalated
+        t.escalated_by = _str(ticket.escalated_by)
+        t.resolution = ticket.resolution
+        t.resolved_by = _str(ticket.resolved_by)
+        t.resolved_at = ticket.resolved_at
+        t.thread_id = _str(ticket.thread_id)
+        t.transcript_message_id = _str(ticket.transcript_message_id)
+        if ticket.created_at:
+            t.created_at = ticket.created_at
 
+        session.flush()
+        _bump_stats(session, IssueTicket, deltas)
+        _publish(session, IssueTicket, ticket.id)
+        saved = _to_issue_record(t)
         session.commit()
+        _issue_ticket_cache.put(ticket.id, saved)
+        return saved
+    except Exception:
+        _issue_ticket_cache.invalidate(ticket.id)
+        raise
     finally:
         session.close()
 
 
 def get_all_issue_tickets():
-    """Get all issue tickets as a dictionary"""
-    session = SessionLocal()
+    """Get all issue tickets, oldest first"""
+    session = ReadSessionLocal()
     try:
-        tickets = session.query(IssueTicket).all()
-        return {t.id: _issue_ticket_to_dict(t) for t in tickets}
+        tickets = session.query(IssueTicket).order_by(IssueTicket.number).all()
+        return [_to_issue_record(t) for t in tickets]
     finally:
         session.close()
 
 
 def next_issue_ticket_id() -> str:
-    """Get next issue ticket ID and increment counter"""
-    session = SessionLocal()
+    """Allocate the next issue ticket ID"""
+    return f"ISS-{_issue_ticket_ids.next():03d}"
+
+
+def claim_issue_ticket(ticket_id: str, mod_id: int) -> bool:
+    """Unclaimed -> IN_PROGRESS. Returns False if already claimed or closed."""
+    return _transition(
+        IssueTicket, _issue_ticket_cache, ticket_id, ACTIVE_ISSUE_STATUSES,
+        {"status": "IN_PROGRESS", "claimed_by": str(mod_id)},
+        IssueTicket.claimed_by.is_(None),
+        event=("CLAIMED", mod_id, None),
+    )
+
+
+# /claim_next order for issue tickets: most urgent first, then oldest
+_ISSUE_PRIORITY_ORDER = case(
+    {"Critical": 0, "High": 1, "Medium": 2, "Low": 3},
+    value=IssueTicket.priority,
+    else_=4,
+)
+
+
+def claim_next_issue_ticket(mod_id: int):
+    """Claim the most urgent, oldest unclaimed issue ticket. Returns its ID or None."""
+    return _claim_next(
+        IssueTicket, _issue_ticket_cache, ACTIVE_ISSUE_STATUSES,
+        (_ISSUE_PRIORITY_ORDER, IssueTicket.number),
+        {"status": "IN_PROGRESS", "claimed_by": str(mod_id)},
+        IssueTicket.claimed_by.is_(None),
+        event=("CLAIMED", mod_id, None),
+    )
+
+
+def escalate_issue_ticket(ticket_id: str, escalated_by: int) -> bool:
+    """-> ESCALATED. Returns False if already escalated or closed."""
+    return _transition(
+        IssueTicket, _issue_ticket_cache, ticket_id, ACTIVE_ISSUE_STATUSES,
+        {"status": "ESCALATED", "escalated": True, "escalated_by": str(escalated_by)},
+        IssueTicket.escalated.isnot(True),
+        event=("ESCALATED", escalated_by, None),
+    )
+
+
+def resolve_issue_ticket(ticket_id: str, resolved_by: int, resolution: str) -> bool:
+    """-> RESOLVED. Returns False if the ticket is already closed."""
+    return _transition(
+        IssueTicket, _issue_ticket_cache, ticket_id, ACTIVE_ISSUE_STATUSES,
+        {
+            "status": "RESOLVED",
+            "resolution": resolution,
+            "resolved_by": str(resolved_by),
+            "resolved_at": datetime.utcnow(),
+        },
+        event=("RESOLVED", resolved_by, {"resolution": resolution}),
+    )
+
+
+def invalidate_issue_ticket(ticket_id: str, resolved_by: int, reason: str) -> bool:
+    """-> INVALID. Returns False if the ticket is already closed."""
+    return _transition(
+        IssueTicket, _issue_ticket_cache, ticket_id, ACTIVE_ISSUE_STATUSES,
+        {
+            "status": "INVALID",
+            "resolution": f"Marked as invalid: {reason}",
+            "resolved_by": str(resolved_by),
+            "resolved_at": datetime.utcnow(),
+        },
+        event=("INVALID", resolved_by, {"reason": reason}),
+    )
+
+
+def iter_issue_ticket_export(status: str = None, since: datetime = None, until: datetime = None,
+                             include_archived: bool = False):
+    """Yield issue tickets as export records, oldest first (see iter_ticket_export)"""
+    session = ReadSessionLocal()
     try:
-        counter = session.query(IssueTicketCounter).first()
-        counter.last_issue_id += 1
-        session.commit()
-        return f"ISS-{counter.last_issue_id:03d}"
+        yield {
+            "export": "issue_tickets",
+            "exported_at": datetime.utcnow().isoformat(),
+            "last_issue_id": _issue_ticket_ids.last_reserved(session),
+            "include_archived": include_archived,
+        }
+
+        if include_archived:
+            yield from _iter_archive(session, "issue", status, since, until)
+
+        query = select(IssueTicket).order_by(IssueTicket.number)
+        if status:
+            query = query.where(IssueTicket.status == status)
+        if since:
+            query = query.where(IssueTicket.created_at >= since)
+        if until:
+            query = query.where(IssueTicket.created_at < until)
+
+        rows = session.execute(query.execution_options(yield_per=EXPORT_PAGE_SIZE)).scalars()
+        for t in rows:
+            yield _to_issue_record(t).to_dict()
+            session.expunge(t)
     finally:
         session.close()
 
 
-def export_issue_tickets_json() -> str:
-    """Export all issue tickets as JSON for audit purposes"""
-    session = SessionLocal()
+def find_issue_ticket_id(thread_id: int = None, transcript_message_id: int = None):
+    """ID of the issue ticket with this private thread or transcript message, or None"""
+    query = select(IssueTicket.id)
+    if thread_id is not None:
+        query = query.where(IssueTicket.thread_id == str(thread_id))
+    elif transcript_message_id is not None:
+        query = query.where(IssueTicket.transcript_message_id == str(transcript_message_id))
+    else:
+        return None
+
+    session = ReadSessionLocal()
     try:
-        counter = session.query(IssueTicketCounter).first()
-        tickets = get_all_issue_tickets()
-        data = {
-            "last_issue_id": counter.last_issue_id if counter else 0,
-            "issue_tickets": tickets,
-        }
-        return json.dumps(data, indent=2)
+        return session.scalar(query)
     finally:
         session.close()
 
 
 def get_issue_tickets_by_status(status: str):
     """Get all issue tickets with a specific status"""
+    session = ReadSessionLocal()
+    try:
+        tickets = (
+            session.query(IssueTicket)
+            .filter(IssueTicket.status == status)
+            .order_by(IssueTicket.number)
+            .all()
+        )
+        return [_to_issue_record(t) for t in tickets]
+    finally:
+        session.close()
+
+
+def get_active_issue_tickets_since(since: datetime):
+    """Open / in-progress / escalated issue tickets created after since"""
+    session = ReadSessionLocal()
+    try:
+        tickets = (
+            session.query(IssueTicket)
+            .filter(IssueTicket.status.in_(ACTIVE_ISSUE_STATUSES), IssueTicket.created_at >= since)
+            .order_by(IssueTicket.number)
+            .all()
+        )
+        return [_to_issue_record(t) for t in tickets]
+    finally:
+        session.close()
+
+
+def record_duplicate_report(ticket_id: str, reported_by: int, description: str) -> bool:
+    """
+    Attach a duplicate report to an active issue ticket's event log.
+
+    Returns False if the ticket has closed in the meantime.
+    """
     session = SessionLocal()
     try:
-        tickets = session.query(IssueTicket).filter_by(status=status).all()
-        return {t.id: _issue_ticket_to_dict(t) for t in tickets}
+        status = session.execute(
+            select(IssueTicket.status).where(IssueTicket.id == ticket_id)
+        ).scalar()
+        if status not in ACTIVE_ISSUE_STATUSES:
+            return False
+
+        _log_event(session, IssueTicket, ticket_id, "DUPLICATE_REPORT", reported_by, {"description": description})
+        session.commit()
+        return True
     finally:
         session.close()
 
 
 def get_issue_tickets_by_user(user_id: int):
     """Get all issue tickets created by a specific user"""
+    session = ReadSessionLocal()
+    try:
+        tickets = (
+            session.query(IssueTicket)
+            .filter(IssueTicket.created_by == str(user_id))
+            .order_by(IssueTicket.number)
+            .all()
+        )
+        return [_to_issue_record(t) for t in tickets]
+    finally:
+        session.close()
+
+
+def search_issue_tickets(query: str, page: int = 0, page_size: int = 10):
+    """
+    Ranked full-text matches over description and resolution.
+
+    Returns (hits, has_more) for the zero-based page.
+    """
+    session = ReadSessionLocal()
+    try:
+        rows = _search_issue_tickets(session.connection(), query, page_size + 1, page * page_size)
+    finally:
+        session.close()
+
+    hits = [
+        IssueSearchHit(ticket_id=r[0], status=r[1], category=r[2], created_at=r[3], snippet=r[4] or "")
+        for r in rows[:page_size]
+    ]
+    return hits, len(rows) > page_size
+
+
+# =================================================
+# Ticket Event Log Functions
+# =================================================
+
+def get_ticket_events(ticket_kind: str, ticket_id: str):
+    """Get the event history of one ticket, oldest first"""
+    session = ReadSessionLocal()
+    try:
+        rows = (
+            session.query(TicketEvent)
+            .filter(TicketEvent.ticket_kind == ticket_kind, TicketEvent.ticket_id == ticket_id)
+            .order_by(TicketEvent.id)
+            .all()
+        )
+        return [
+            TicketEventRecord(
+                ticket_kind=e.ticket_kind,
+                ticket_id=e.ticket_id,
+                event_type=e.event_type,
+                actor_id=_int(e.actor_id),
+                created_at=e.created_at,
+                payload=json.loads(e.payload) if e.payload else {},
+            )
+            for e in rows
+        ]
+    finally:
+        session.close()
+
+
+# =================================================
+# Retention / Archive Functions
+# =================================================
+
+def _iter_archive(session, ticket_kind: str, status=None, since=None, until=None):
+    """Stream archived export records of one kind, oldest first"""
+    query = (
+        select(TicketArchive.payload)
+        .where(TicketArchive.ticket_kind == ticket_kind)
+        .order_by(TicketArchive.number)
+    )
+    if status:
+        query = query.where(TicketArchive.status == status)
+    if since:
+        query = query.where(TicketArchive.created_at >= since)
+    if until:
+        query = query.where(TicketArchive.created_at < until)
+
+    for payload in session.execute(query.execution_options(yield_per=EXPORT_PAGE_SIZE)).scalars():
+        yield json.loads(payload)
+
+
+def _closed_at(model, statuses):
+    """
+    When a closed row was closed: cancelled_at / resolved_at, else the time
+    of its closing event (approvals have no column), else created_at for
+    rows imported without either.
+    """
+    closing_event = (
+        select(func.max(TicketEvent.created_at))
+        .where(
+            TicketEvent.ticket_kind == _TICKET_KINDS[model.__tablename__],
+            TicketEvent.ticket_id == model.id,
+            TicketEvent.event_type.in_(statuses),
+        )
+        .scalar_subquery()
+    )
+    closed_column = model.cancelled_at if model is Ticket else model.resolved_at
+    return func.coalesce(closed_column, closing_event, model.created_at)
+
+
+def _archive_batch(model, to_record, cache, statuses, cutoff: datetime, batch_size: int) -> int:
+    """Move one batch of rows closed before cutoff into ticket_archive; returns rows moved"""
+    session = SessionLocal()
+    try:
+        rows = session.execute(
+            select(model)
+            .where(model.status.in_(statuses), _closed_at(model, statuses) < cutoff)
+            .order_by(model.number)
+            .limit(batch_size)
+        ).scalars().all()
+        if not rows:
+            return 0
+
+        archived_at = datetime.utcnow()
+        session.execute(insert(TicketArchive), [
+            {
+                "ticket_kind": _TICKET_KINDS[model.__tablename__],
+                "ticket_id": t.id,
+                "number": t.number,
+                "status": t.status,
+                "created_at": t.created_at,
+                "archived_at": archived_at,
+                "payload": json.dumps(to_record(t).to_dict()),
+            }
+            for t in rows
+        ])
+
+        ids = [t.id for t in rows]
+        if model is Ticket:
+            session.execute(
+                delete(TicketMember).where(TicketMember.ticket_id.in_(ids)),
+                execution_options={"synchronize_session": False},
+            )
+        session.execute(
+            delete(model).where(model.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        for ticket_id in ids:
+            _publish(session, model, ticket_id)
+        session.commit()
+
+        for ticket_id in ids:
+            cache.invalidate(ticket_id)
+        return len(ids)
+    finally:
+        session.close()
+
+
+def archive_closed_tickets(older_than_days: int, batch_size: int = EXPORT_PAGE_SIZE) -> dict:
+    """
+    Move tickets closed more than older_than_days ago out of the hot
+    tables, in short batches so writers are never blocked for long.
+
+    Returns the number of archived rows per ticket kind.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = {"study": 0, "issue": 0}
+
+    for kind, args in (
+        ("study", (Ticket, _to_study_ticket, _ticket_cache, CLOSED_TICKET_STATUSES)),
+        ("issue", (IssueTicket, _to_issue_record, _issue_ticket_cache, CLOSED_ISSUE_STATUSES)),
+    ):
+        while True:
+            count = _archive_batch(*args, cutoff, batch_size)
+            moved[kind] += count
+            if count < batch_size:
+                break
+
+    return moved
+
+
+# =================================================
+# Bulk Import Functions
+# =================================================
+# Used by services/importer.py. Records are in export (to_dict) or legacy
+# tickets.json shape; rows whose ID already exists are skipped, so an
+# import can be re-run safely.
+
+def _datetime(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _dialect_insert(table):
+    return (pg_insert if engine.dialect.name == "postgresql" else sqlite_insert)(table)
+
+
+def import_ticket_batch(records) -> int:
+    """
+    Insert study ticket records with one executemany each; returns rows inserted.
+
+    Like an ID already in the database, a repeated ID within records keeps
+    its first occurrence, so results do not depend on the batch size.
+    """
+    tickets = {}
+    for r in records:
+        tickets.setdefault(r["id"], {
+            "id": r["id"],
+            "number": int(r["id"]),
+            "group_name": r["group_name"],
+            "level": r["level"],
+            "member_count": r["member_count"],
+            "members": json.dumps([int(uid) for uid in r["members"]]),
+            "created_by": str(r["created_by"]),
+            "status": r["status"],
+            "claimed_by": _str(r.get("claimed_by")),
+            "cancelled_by": _str(r.get("cancelled_by")),
+            "cancelled_at": _datetime(r.get("cancelled_at")),
+            "cancellation_reason": r.get("cancellation_reason"),
+            "approval_message_id": _str(r.get("approval_message_id")),
+            "approved_members": json.dumps([int(uid) for uid in r.get("approved_members") or []]),
+            "transcript_message_id": _str(r.get("transcript_message_id")),
+            "created_at": _datetime(r.get("created_at")) or datetime.utcnow(),
+        })
+    if not tickets:
+        return 0
+
+    session = SessionLocal()
+    try:
+        inserted = session.execute(
+            _dialect_insert(Ticket.__table__)
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(Ticket.__table__.c.id),
+            list(tickets.values()),
+        ).scalars().all()
+
+        members = []
+        for ticket_id in inserted:
+            row = tickets[ticket_id]
+            approved = set(json.loads(row["approved_members"]))
+            members.extend(
+                {"ticket_id": ticket_id, "user_id": str(uid), "position": position, "approved": uid in approved}
+                for position, uid in enumerate(dict.fromkeys(json.loads(row["members"])))
+            )
+        if members:
+            session.execute(TicketMember.__table__.insert(), members)
+
+        # Count only the rows actually inserted, so re-runs add nothing
+        deltas = []
+        for ticket_id in inserted:
+            row = tickets[ticket_id]
+            deltas.extend(study_ticket_deltas(
+                row["status"], row["level"], row["claimed_by"], row["created_at"], row["cancelled_at"]
+            ))
+        _bump_stats(session, Ticket, deltas)
+
+        session.commit()
+        return len(inserted)
+    finally:
+        session.close()
+
+
+def import_issue_ticket_batch(records) -> int:
+    """Insert issue ticket records with one executemany; returns rows inserted (first ID wins)"""
+    tickets = {}
+    for r in records:
+        tickets.setdefault(r["id"], {
+            "id": r["id"],
+            "number": int(r["id"].split("-")[1]),
+            "category": r["category"],
+            "priority": r["priority"],
+            "description": r["description"],
+            "created_by": str(r["created_by"]),
+            "anonymous": bool(r.get("anonymous")),
+            "reported_user": _str(r.get("reported_user")),
+            "status": r["status"],
+            "claimed_by": _str(r.get("claimed_by")),
+            "escalated": bool(r.get("escalated")),
+            "escalated_by": _str(r.get("escalated_by")),
+            "resolution": r.get("resolution"),
+            "resolved_by": _str(r.get("resolved_by")),
+            "resolved_at": _datetime(r.get("resolved_at")),
+            "thread_id": _str(r.get("thread_id")),
+            "transcript_message_id": _str(r.get("transcript_message_id")),
+            "created_at": _datetime(r.get("created_at")) or datetime.utcnow(),
+        })
+    if not tickets:
+        return 0
+
+    session = SessionLocal()
+    try:
+        inserted = session.execute(
+            _dialect_insert(IssueTicket.__table__)
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(IssueTicket.__table__.c.id),
+            list(tickets.values()),
+        ).scalars().all()
+
+        deltas = []
+        for ticket_id in inserted:
+            row = tickets[ticket_id]
+            deltas.extend(issue_ticket_deltas(
+                row["status"], row["category"], row["priority"],
+                row["claimed_by"], row["created_at"], row["resolved_at"]
+            ))
+        _bump_stats(session, IssueTicket, deltas)
+
+        session.commit()
+        return len(inserted)
+    finally:
+        session.close()
+
+
+def finish_import(last_ticket_id: int = 0, last_issue_id: int = 0):
+    """
+    Restore the ID counters after an import.
+
+    Each counter becomes the highest of its current value, the exported
+    counter and the largest number now in use (live or archived), and the
+    Postgres sequences are moved up to match.
+    """
+    session = SessionLocal()
+    try:
+        for counter_column, model, kind, exported in (
+            (TicketCounter.last_ticket_id, Ticket, "study", last_ticket_id),
+            (IssueTicketCounter.last_issue_id, IssueTicket, "issue", last_issue_id),
+        ):
+            highest = max(
+                session.query(counter_column).scalar() or 0,
+                exported or 0,
+                session.query(func.max(model.number)).scalar() or 0,
+                session.query(func.max(TicketArchive.number))
+                .filter(TicketArchive.ticket_kind == kind).scalar() or 0,
+            )
+            session.execute(update(counter_column.class_).values({counter_column: highest}))
+
+        if engine.dialect.name == "postgresql":
+            _ticket_ids.prepare_sequence(session)
+            _issue_ticket_ids.prepare_sequence(session)
+
+        _publish(session, None, None)
+        session.commit()
+    finally:
+        session.close()
+
+    _ticket_cache.clear()
+    _issue_ticket_cache.clear()
+
+
+# =================================================
+# Ticket Statistics Functions
+# =================================================
+
+def fold_ticket_stats() -> int:
+    """Move pending counter deltas into ticket_stats; returns rows folded"""
     session = SessionLocal()
     try:
-        tickets = session.query(IssueTicket).filter_by(created_by=str(user_id)).all()
-        return {t.id: _issue_ticket_to_dict(t) for t in tickets}
+        # DELETE ... RETURNING claims exactly the rows it removes, so deltas
+        # committed meanwhile wait for the next fold instead of being lost
+        rows = session.execute(
+            delete(TicketStatDelta).returning(
+                TicketStatDelta.kind, TicketStatDelta.metric, TicketStatDelta.bucket, TicketStatDelta.delta
+            )
+        ).all()
+
+        totals = Counter()
+        for kind, metric, bucket, delta in rows:
+            totals[(kind, metric, bucket)] += delta
+        values = [
+            {"kind": kind, "metric": metric, "bucket": bucket, "value": value}
+            for (kind, metric, bucket), value in sorted(totals.items())  # stable lock order
+            if value
+        ]
+
+        if values:
+            stmt = _dialect_insert(TicketStat.__table__).values(values)
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=["kind", "metric", "bucket"],
+                set_={"value": TicketStat.value + stmt.excluded.value},
+            ))
+        session.commit()
+        return len(rows)
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+def get_ticket_stats(days: int = 7) -> dict:
+    """
+    Read the rollup counters as {kind: {metric: {bucket: value}}}.
+
+    Per-day buckets are limited to the last `days` days; every other
+    metric is a fixed, small set of rows.
+    """
+    cutoff = (datetime.utcnow() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    session = ReadSessionLocal()
+    try:
+        rows = session.execute(
+            select(TicketStat.kind, TicketStat.metric, TicketStat.bucket, TicketStat.value)
+            .where((TicketStat.metric != "created_day") | (TicketStat.bucket >= cutoff))
+        ).all()
+        # Deltas not folded yet, so the numbers are current
+        pending = session.execute(
+            select(
+                TicketStatDelta.kind, TicketStatDelta.metric, TicketStatDelta.bucket,
+                func.sum(TicketStatDelta.delta)
+            )
+            .where((TicketStatDelta.metric != "created_day") | (TicketStatDelta.bucket >= cutoff))
+            .group_by(TicketStatDelta.kind, TicketStatDelta.metric, TicketStatDelta.bucket)
+        ).all()
+    finally:
+        session.close()
+
+    stats = {"study": {}, "issue": {}}
+    for kind, metric, bucket, value in [*rows, *pending]:
+        buckets = stats.setdefault(kind, {}).setdefault(metric, {})
+        buckets[bucket] = buckets.get(bucket, 0) + value
+    return stats
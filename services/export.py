@@ -0,0 +1,44 @@
+import gzip
+import io
+import json
+
+# Room left for data still buffered inside the compressor, which is not
+# yet visible in the output size when deciding whether a part is full.
+_COMPRESSOR_SLACK = 256 * 1024
+
+
+def gzip_ndjson_parts(records, max_bytes: int):
+    """
+    Stream records into gzip-compressed NDJSON parts.
+
+    Yields one io.BytesIO per part, each a complete .ndjson.gz file no
+    larger than max_bytes. Only the part being written is held in memory,
+    so peak memory is bounded by max_bytes however many records there are.
+    """
+    buf, gz = _new_part()
+    written = False
+
+    for record in records:
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+
+        if written and buf.tell() + len(line) > max_bytes - _COMPRESSOR_SLACK:
+            yield _close_part(buf, gz)
+            buf, gz = _new_part()
+            written = False
+
+        gz.write(line)
+        written = True
+
+    if written:
+        yield _close_part(buf, gz)
+
+
+def _new_part():
+    buf = io.BytesIO()
+    return buf, gzip.GzipFile(fileobj=buf, mode="wb")
+
+
+def _close_part(buf, gz):
+    gz.close()
+    buf.seek(0)
+    return buf
@@ -0,0 +1,129 @@
+import argparse
+import gzip
+import json
+import time
+
+from services import database
+
+# =================================================
+# Bulk Importer
+# =================================================
+# Loads ticket data back into the database, e.g. when moving from the
+# local SQLite file to PostgreSQL:
+#
+#   python -m services.importer data/tickets.json
+#   python -m services.importer tickets_*_part*.ndjson.gz issue_tickets_*.ndjson.gz
+#
+# Accepts the legacy tickets.json / export_*_json() documents
+# ({"last_ticket_id": N, "tickets": {id: {...}}}) and the NDJSON(.gz)
+# parts written by /export_tickets and /export_issue_tickets. NDJSON is
+# streamed line by line; the legacy format is a single JSON document and
+# is read in one go. Records are inserted in batches with one executemany
+# per table, existing IDs are skipped, and the ID counters are restored
+# at the end. An ID that appears more than once in the input keeps its
+# first occurrence and later ones are counted as duplicates. Stop the bot while importing so it does not hand out IDs
+# from a block reserved before the import.
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _kind(record: dict) -> str:
+    return "issue" if "category" in record else "study"
+
+
+def _legacy_records(document: dict, key: str):
+    tickets = document.get(key) or {}
+    if isinstance(tickets, dict):
+        # Legacy shape: {ticket_id: {...fields without id...}}
+        for ticket_id, record in tickets.items():
+            yield {**record, "id": ticket_id}
+    else:
+        yield from tickets
+
+
+def read_records(path: str, counters: dict):
+    """
+    Yield (kind, record) pairs from one file.
+
+    Export metadata (last_ticket_id / last_issue_id) is merged into
+    counters instead of being yielded.
+    """
+    with _open(path) as f:
+        if ".ndjson" in path:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "export" in record:
+                    for key in ("last_ticket_id", "last_issue_id"):
+                        counters[key] = max(counters[key], record.get(key) or 0)
+                    continue
+                yield _kind(record), record
+        else:
+            document = json.load(f)
+            for key in ("last_ticket_id", "last_issue_id"):
+                counters[key] = max(counters[key], document.get(key) or 0)
+            for record in _legacy_records(document, "tickets"):
+                yield "study", record
+            for record in _legacy_records(document, "issue_tickets"):
+                yield "issue", record
+
+
+def import_files(paths, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Import every file and restore the counters; returns per-kind [read, inserted, duplicates]"""
+    insert = {"study": database.import_ticket_batch, "issue": database.import_issue_ticket_batch}
+    counters = {"last_ticket_id": 0, "last_issue_id": 0}
+    totals = {"study": [0, 0, 0], "issue": [0, 0, 0]}  # kind -> [read, inserted, duplicates]
+    batches = {"study": [], "issue": []}
+    seen = {"study": set(), "issue": set()}
+
+    def flush(kind):
+        if batches[kind]:
+            totals[kind][1] += insert[kind](batches[kind])
+            batches[kind] = []
+
+    for path in paths:
+        for kind, record in read_records(path, counters):
+            totals[kind][0] += 1
+            if record["id"] in seen[kind]:
+                totals[kind][2] += 1
+                continue
+            seen[kind].add(record["id"])
+            batches[kind].append(record)
+            if len(batches[kind]) >= batch_size:
+                flush(kind)
+        print(f"[Importer] Read {path}")
+
+    for kind in batches:
+        flush(kind)
+
+    database.finish_import(counters["last_ticket_id"], counters["last_issue_id"])
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import ticket JSON / NDJSON exports")
+    parser.add_argument("paths", nargs="+", help="tickets.json, *.ndjson or *.ndjson.gz files")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    database.init_db()
+    start = time.perf_counter()
+    totals = import_files(args.paths, args.batch_size)
+
+    for kind, (read, inserted, duplicates) in totals.items():
+        print(
+            f"[Importer] {kind}: {inserted} inserted, {read - inserted - duplicates} already present, "
+            f"{duplicates} duplicate IDs skipped"
+        )
+    print(f"[Importer] Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import json
+import select
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+# =================================================
+# Cross-Instance Cache Invalidation
+# =================================================
+# Every write that changes a ticket publishes (kind, ticket_id) in the
+# same transaction, so the message only goes out if the write commits:
+#
+#   Postgres  pg_notify on CHANNEL; a dedicated LISTEN connection per
+#             instance receives it as soon as the writer commits
+#   SQLite    a row in cache_invalidations; each instance polls for
+#             ids above the last one it has seen
+#
+# Receivers drop exactly that cache entry. Messages from this process are
+# skipped (its own caches are already up to date). ticket_id None means
+# "drop everything of this kind"; kind None means both kinds. After the
+# Postgres listener reconnects it drops everything, since notifications
+# sent while it was away are lost.
+
+CHANNEL = "cssbot_invalidate"
+
+# SQLite log rows older than this are pruned by the pollers
+LOG_RETENTION = timedelta(minutes=10)
+
+INSTANCE_ID = uuid.uuid4().hex[:12]
+
+
+class InvalidationBus:
+    def __init__(self, engine, poll_seconds: float):
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self._handler = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_postgres(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    # ---------- publishing ----------
+    def publish(self, conn, kind, ticket_id):
+        """Queue an invalidation inside the caller's transaction"""
+        if self.is_postgres:
+            payload = json.dumps({"i": INSTANCE_ID, "k": kind, "t": ticket_id})
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+        else:
+            conn.execute(
+                text(
+                    "INSERT INTO cache_invalidations (instance_id, kind, ticket_id, created_at) "
+                    "VALUES (:i, :k, :t, :at)"
+                ),
+                {"i": INSTANCE_ID, "k": kind, "t": ticket_id, "at": datetime.utcnow()},
+            )
+
+    # ---------- receiving ----------
+    def start(self, handler):
+        """Deliver other instances' invalidations to handler(kind, ticket_id) on a daemon thread"""
+        if self._thread is not None:
+            return
+        self._handler = handler
+        target = self._listen_postgres if self.is_postgres else self._poll_sqlite
+        self._thread = threading.Thread(target=target, name="cssbot-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _dispatch(self, instance_id, kind, ticket_id):
+        if instance_id == INSTANCE_ID:
+            return
+        try:
+            self._handler(kind, ticket_id)
+        except Exception as e:
+            print(f"[Database] Invalidation handler failed: {e}")
+
+    def _listen_postgres(self):
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self.engine.raw_connection()
+                raw.detach()  # held for the life of the listener, not a pool slot
+                conn = raw.driver_connection
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+
+                # Anything sent while we were not listening is lost
+                self._dispatch(None, None, None)
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        message = json.loads(conn.notifies.pop(0).payload)
+                        self._dispatch(message.get("i"), message.get("k"), message.get("t"))
+            except Exception as e:
+                print(f"[Database] Invalidation listener lost its connection: {e}")
+                self._stop.wait(5)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+    def _poll_sqlite(self):
+        last_id = None
+        last_prune = time.monotonic()
+        while not self._stop.wait(0 if last_id is None else self.poll_seconds):
+            try:
+                with self.engine.connect() as conn:
+                    if last_id is None:
+                        last_id = conn.execute(
+                            text("SELECT COALESCE(MAX(id), 0) FROM cache_invalidations")
+                        ).scalar()
+                        continue
+
+                    rows = conn.execute(
+                        text(
+                            "SELECT id, instance_id, kind, ticket_id FROM cache_invalidations "
+                            "WHERE id > :last ORDER BY id"
+                        ),
+                        {"last": last_id},
+                    ).all()
+                    for row_id, instance_id, kind, ticket_id in rows:
+                        self._dispatch(instance_id, kind, ticket_id)
+                        last_id = row_id
+
+                    if time.monotonic() - last_prune > LOG_RETENTION.total_seconds():
+                        conn.execute(
+                            text("DELETE FROM cache_invalidations WHERE created_at < :cutoff"),
+                            {"cutoff": datetime.utcnow() - LOG_RETENTION},
+                        )
+                        conn.commit()
+                        last_prune = time.monotonic()
+            except Exception as e:
+                print(f"[Database] Invalidation poll failed: {e}")
+                self._stop.wait(self.poll_seconds)
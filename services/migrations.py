@@ -0,0 +1,176 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from services.stats import rebuild_ticket_stats
+from services.search import create_issue_search, rebuild_issue_search
+
+# =================================================
+# Schema Migrations
+# =================================================
+# Base.metadata.create_all only creates missing tables. Anything that
+# changes an existing table (new columns, new indexes, backfills) goes
+# here as an ordered migration. Applied versions are recorded in
+# schema_version so each migration runs exactly once per database.
+#
+# Migrations must be safe to re-run (IF NOT EXISTS, column checks), since
+# a fresh database gets the full schema from create_all and is only
+# stamped with the latest version.
+
+
+def _add_column(conn, table: str, column: str, ddl: str):
+    """Add a column unless the table already has it"""
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _create_index(conn, name: str, table: str, columns: str, unique: bool = False):
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+# -------------------------------------------------
+# 1: integer ticket numbers + query indexes
+# -------------------------------------------------
+
+def _v1_ticket_numbers_and_indexes(conn):
+    _add_column(conn, "tickets", "number", "INTEGER")
+    _add_column(conn, "issue_tickets", "number", "INTEGER")
+
+    # "01" -> 1, "ISS-003" -> 3
+    conn.execute(text(
+        "UPDATE tickets SET number = CAST(id AS INTEGER) WHERE number IS NULL"
+    ))
+    conn.execute(text(
+        "UPDATE issue_tickets SET number = CAST(SUBSTR(id, 5) AS INTEGER) WHERE number IS NULL"
+    ))
+
+    _create_index(conn, "ix_tickets_number", "tickets", "number", unique=True)
+    _create_index(conn, "ix_tickets_status", "tickets", "status")
+    _create_index(conn, "ix_tickets_created_by", "tickets", "created_by")
+    _create_index(conn, "ix_tickets_approval_message_id", "tickets", "approval_message_id")
+    _create_index(conn, "ix_tickets_created_at", "tickets", "created_at")
+
+    _create_index(conn, "ix_issue_tickets_number", "issue_tickets", "number", unique=True)
+    _create_index(conn, "ix_issue_tickets_status", "issue_tickets", "status")
+    _create_index(conn, "ix_issue_tickets_created_by", "issue_tickets", "created_by")
+    _create_index(conn, "ix_issue_tickets_thread_id", "issue_tickets", "thread_id")
+    _create_index(conn, "ix_issue_tickets_created_at", "issue_tickets", "created_at")
+
+
+# -------------------------------------------------
+# 2: backfill ticket_stats rollup counters
+# -------------------------------------------------
+
+def _v2_backfill_ticket_stats(conn):
+    rebuild_ticket_stats(conn)
+
+
+# -------------------------------------------------
+# 3: full-text search over issue tickets
+# -------------------------------------------------
+
+def _v3_issue_ticket_search(conn):
+    create_issue_search(conn)
+    rebuild_issue_search(conn)
+
+
+# -------------------------------------------------
+# 4: transcript message lookups for legacy buttons
+# -------------------------------------------------
+
+def _v4_transcript_message_indexes(conn):
+    _create_index(conn, "ix_tickets_transcript_message_id", "tickets", "transcript_message_id")
+    _create_index(conn, "ix_issue_tickets_transcript_message_id", "issue_tickets", "transcript_message_id")
+
+
+# -------------------------------------------------
+# 5: never reuse cache_invalidations ids on SQLite
+# -------------------------------------------------
+
+def _v5_cache_invalidations_autoincrement(conn):
+    if conn.dialect.name != "sqlite":
+        return  # SERIAL ids are never reused
+    sql = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cache_invalidations'"
+    )).scalar()
+    if sql is None or "AUTOINCREMENT" in sql.upper():
+        return
+
+    # SQLite cannot add AUTOINCREMENT in place; rebuild the table, keeping rows
+    conn.execute(text("ALTER TABLE cache_invalidations RENAME TO cache_invalidations_old"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_cache_invalidations_created_at"))
+    conn.execute(text(
+        "CREATE TABLE cache_invalidations ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "instance_id VARCHAR NOT NULL, "
+        "kind VARCHAR, "
+        "ticket_id VARCHAR, "
+        "created_at DATETIME NOT NULL)"
+    ))
+    _create_index(conn, "ix_cache_invalidations_created_at", "cache_invalidations", "created_at")
+    conn.execute(text(
+        "INSERT INTO cache_invalidations (id, instance_id, kind, ticket_id, created_at) "
+        "SELECT id, instance_id, kind, ticket_id, created_at FROM cache_invalidations_old"
+    ))
+    conn.execute(text("DROP TABLE cache_invalidations_old"))
+
+
+# (version, name, function) - append only, never reorder
+MIGRATIONS = [
+    (1, "ticket_numbers_and_indexes", _v1_ticket_numbers_and_indexes),
+    (2, "backfill_ticket_stats", _v2_backfill_ticket_stats),
+    (3, "issue_ticket_search", _v3_issue_ticket_search),
+    (4, "transcript_message_indexes", _v4_transcript_message_indexes),
+    (5, "cache_invalidations_autoincrement", _v5_cache_invalidations_autoincrement),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# -------------------------------------------------
+# Runner
+# -------------------------------------------------
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, "
+        "name VARCHAR NOT NULL, "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def _record(conn, version: int, name: str):
+    conn.execute(
+        text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+        {"v": version, "n": name, "t": datetime.utcnow()},
+    )
+
+
+def run_migrations(engine, fresh: bool = False):
+    """
+    Apply pending migrations in order, each in its own transaction.
+
+    fresh=True means create_all just built the whole current schema, so
+    every migration is recorded as applied without running it.
+    """
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_version"))}
+
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        with engine.begin() as conn:
+            if not fresh:
+                migrate(conn)
+            _record(conn, version, name)
+
+        if not fresh:
+            print(f"[Database] Applied migration {version}: {name}")
+
+    if fresh and len(applied) < len(MIGRATIONS):
+        print(f"[Database] New database stamped at schema version {LATEST_VERSION}")
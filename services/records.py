@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+# =================================================
+# Ticket Records
+# =================================================
+# What the repository hands to the cogs. Records are frozen and slotted:
+# Discord IDs stay ints, datetimes stay datetimes, member lists are
+# tuples, and the same object can be shared by the cache and every
+# handler without copying. Use dataclasses.replace() to derive a changed
+# record. The dict form only exists at the export boundary (to_dict).
+
+
+def _iso(value: Optional[datetime]):
+    return value.isoformat() if value else None
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class StudyTicket:
+    id: str
+    group_name: str
+    level: str
+    member_count: int
+    members: Tuple[int, ...]
+    created_by: int
+    status: str
+    claimed_by: Optional[int] = None
+    cancelled_by: Optional[int] = None
+    cancelled_at: Optional[datetime] = None
+    cancellation_reason: Optional[str] = None
+    approval_message_id: Optional[int] = None
+    approved_members: Tuple[int, ...] = ()
+    transcript_message_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        """JSON-ready export form"""
+        return {
+            "id": self.id,
+            "group_name": self.group_name,
+            "level": self.level,
+            "member_count": self.member_count,
+            "members": list(self.members),
+            "created_by": _str(self.created_by),
+            "status": self.status,
+            "claimed_by": _str(self.claimed_by),
+            "cancelled_by": _str(self.cancelled_by),
+            "cancelled_at": _iso(self.cancelled_at),
+            "cancellation_reason": self.cancellation_reason,
+            "approval_message_id": _str(self.approval_message_id),
+            "approved_members": list(self.approved_members),
+            "transcript_message_id": _str(self.transcript_message_id),
+            "created_at": _iso(self.created_at),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class IssueTicketRecord:
+    id: str
+    category: str
+    priority: str
+    description: str
+    created_by: int
+    status: str
+    anonymous: bool = False
+    reported_user: Optional[int] = None
+    claimed_by: Optional[int] = None
+    escalated: bool = False
+    escalated_by: Optional[int] = None
+    resolution: Optional[str] = None
+    resolved_by: Optional[int] = None
+    resolved_at: Optional[datetime] = None
+    thread_id: Optional[int] = None
+    transcript_message_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        """JSON-ready export form"""
+        return {
+            "id": self.id,
+            "category": self.category,
+            "priority": self.priority,
+            "description": self.description,
+            "created_by": _str(self.created_by),
+            "anonymous": self.anonymous,
+            "reported_user": _str(self.reported_user),
+            "status": self.status,
+            "claimed_by": _str(self.claimed_by),
+            "escalated": self.escalated,
+            "escalated_by": _str(self.escalated_by),
+            "resolution": self.resolution,
+            "resolved_by": _str(self.resolved_by),
+            "resolved_at": _iso(self.resolved_at),
+            "thread_id": _str(self.thread_id),
+            "transcript_message_id": _str(self.transcript_message_id),
+            "created_at": _iso(self.created_at),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class TicketEventRecord:
+    ticket_kind: str  # "study" or "issue"
+    ticket_id: str
+    event_type: str
+    actor_id: Optional[int]
+    created_at: datetime
+    payload: dict
+
+
+@dataclass(frozen=True, slots=True)
+class IssueSearchHit:
+    ticket_id: str
+    status: str
+    category: str
+    created_at: Optional[datetime]
+    snippet: str
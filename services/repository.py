@@ -0,0 +1,242 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from services import database, backup
+from services.export import gzip_ndjson_parts
+from services.records import StudyTicket, IssueTicketRecord
+
+# =================================================
+# Async repository
+# =================================================
+# services.database is plain synchronous SQLAlchemy. Cogs go through this
+# module instead so every query runs on a small, bounded thread pool and a
+# slow round trip never blocks the gateway heartbeat or other interactions.
+
+_executor = ThreadPoolExecutor(
+    max_workers=config.DB_MAX_WORKERS,
+    thread_name_prefix="cssbot-db",
+)
+
+
+async def _run(func, *args, **kwargs):
+    """Run a blocking database function on the repository executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def checkpoint_wal():
+    return await _run(database.checkpoint_wal)
+
+
+async def backup_database():
+    # Own thread: a long backup must not tie up a repository worker
+    return await asyncio.to_thread(backup.backup_database, database.engine)
+
+
+# In-memory diagnostics: no I/O, so no executor hop
+get_cache_stats = database.get_cache_stats
+get_pool_stats = database.get_pool_stats
+
+
+def subscribe_changes(callback):
+    """
+    Await callback(kind, ticket_id) on the running event loop for every
+    ticket change made by another bot instance.
+    """
+    loop = asyncio.get_running_loop()
+    database.subscribe_changes(
+        lambda kind, ticket_id: asyncio.run_coroutine_threadsafe(callback(kind, ticket_id), loop)
+    )
+
+
+async def _iterate(iterator):
+    """Drive a blocking iterator on the executor, one item per step"""
+    done = object()
+    try:
+        while True:
+            item = await _run(next, iterator, done)
+            if item is done:
+                return
+            yield item
+    finally:
+        await _run(iterator.close)
+
+
+# =================================================
+# Study Group Tickets
+# =================================================
+
+async def get_ticket(ticket_id: str):
+    return await _run(database.get_ticket, ticket_id)
+
+
+async def find_ticket_id_by_transcript(message_id: int):
+    return await _run(database.find_ticket_id_by_transcript, message_id)
+
+
+async def save_ticket(ticket: StudyTicket) -> StudyTicket:
+    return await _run(database.save_ticket, ticket)
+
+
+async def get_all_tickets():
+    return await _run(database.get_all_tickets)
+
+
+async def get_active_approval_message_ids() -> set:
+    return await _run(database.get_active_approval_message_ids)
+
+
+async def get_groups_for_user(user_id: int):
+    return await _run(database.get_groups_for_user, user_id)
+
+
+async def get_pending_group_memberships(user_ids) -> dict:
+    return await _run(database.get_pending_group_memberships, user_ids)
+
+
+async def record_approvals(approval_message_id, user_ids):
+    return await _run(database.record_approvals, approval_message_id, user_ids)
+
+
+async def claim_ticket(ticket_id: str, admin_id: int) -> bool:
+    return await _run(database.claim_ticket, ticket_id, admin_id)
+
+
+async def claim_next_ticket(admin_id: int):
+    return await _run(database.claim_next_ticket, admin_id)
+
+
+async def release_ticket(ticket_id: str, admin_id: int) -> bool:
+    return await _run(database.release_ticket, ticket_id, admin_id)
+
+
+async def set_approval_message(ticket_id: str, message_id):
+    return await _run(database.set_approval_message, ticket_id, message_id)
+
+
+async def cancel_ticket(ticket_id: str, cancelled_by: int, reason: str) -> bool:
+    return await _run(database.cancel_ticket, ticket_id, cancelled_by, reason)
+
+
+async def approve_ticket(ticket_id: str) -> bool:
+    return await _run(database.approve_ticket, ticket_id)
+
+
+async def next_ticket_id() -> str:
+    return await _run(database.next_ticket_id)
+
+
+async def iter_ticket_export_parts(status=None, since=None, until=None, include_archived=False):
+    """Yield gzip NDJSON export parts, each built off the event loop"""
+    parts = gzip_ndjson_parts(
+        database.iter_ticket_export(status, since, until, include_archived),
+        config.EXPORT_PART_MAX_BYTES,
+    )
+    async for part in _iterate(parts):
+        yield part
+
+
+# =================================================
+# Issue Tickets
+# =================================================
+
+async def get_issue_ticket(ticket_id: str):
+    return await _run(database.get_issue_ticket, ticket_id)
+
+
+async def save_issue_ticket(ticket: IssueTicketRecord) -> IssueTicketRecord:
+    return await _run(database.save_issue_ticket, ticket)
+
+
+async def get_all_issue_tickets():
+    return await _run(database.get_all_issue_tickets)
+
+
+async def next_issue_ticket_id() -> str:
+    return await _run(database.next_issue_ticket_id)
+
+
+async def claim_issue_ticket(ticket_id: str, mod_id: int) -> bool:
+    return await _run(database.claim_issue_ticket, ticket_id, mod_id)
+
+
+async def claim_next_issue_ticket(mod_id: int):
+    return await _run(database.claim_next_issue_ticket, mod_id)
+
+
+async def escalate_issue_ticket(ticket_id: str, escalated_by: int) -> bool:
+    return await _run(database.escalate_issue_ticket, ticket_id, escalated_by)
+
+
+async def resolve_issue_ticket(ticket_id: str, resolved_by: int, resolution: str) -> bool:
+    return await _run(database.resolve_issue_ticket, ticket_id, resolved_by, resolution)
+
+
+async def invalidate_issue_ticket(ticket_id: str, resolved_by: int, reason: str) -> bool:
+    return await _run(database.invalidate_issue_ticket, ticket_id, resolved_by, reason)
+
+
+async def iter_issue_ticket_export_parts(status=None, since=None, until=None, include_archived=False):
+    """Yield gzip NDJSON export parts, each built off the event loop"""
+    parts = gzip_ndjson_parts(
+        database.iter_issue_ticket_export(status, since, until, include_archived),
+        config.EXPORT_PART_MAX_BYTES,
+    )
+    async for part in _iterate(parts):
+        yield part
+
+
+async def find_issue_ticket_id(thread_id: int = None, transcript_message_id: int = None):
+    return await _run(database.find_issue_ticket_id, thread_id, transcript_message_id)
+
+
+async def get_issue_tickets_by_status(status: str):
+    return await _run(database.get_issue_tickets_by_status, status)
+
+
+async def get_issue_tickets_by_user(user_id: int):
+    return await _run(database.get_issue_tickets_by_user, user_id)
+
+
+async def get_active_issue_tickets_since(since):
+    return await _run(database.get_active_issue_tickets_since, since)
+
+
+async def record_duplicate_report(ticket_id: str, reported_by: int, description: str) -> bool:
+    return await _run(database.record_duplicate_report, ticket_id, reported_by, description)
+
+
+async def search_issue_tickets(query: str, page: int = 0, page_size: int = 10):
+    return await _run(database.search_issue_tickets, query, page, page_size)
+
+
+# =================================================
+# Ticket Event Log
+# =================================================
+
+async def get_ticket_events(ticket_kind: str, ticket_id: str):
+    return await _run(database.get_ticket_events, ticket_kind, ticket_id)
+
+
+# =================================================
+# Retention
+# =================================================
+
+async def archive_closed_tickets(older_than_days: int):
+    return await _run(database.archive_closed_tickets, older_than_days)
+
+
+# =================================================
+# Ticket Statistics
+# =================================================
+
+async def fold_ticket_stats() -> int:
+    return await _run(database.fold_ticket_stats)
+
+
+async def get_ticket_stats(days: int = 7):
+    return await _run(database.get_ticket_stats, days)
@@ -0,0 +1,106 @@
+from sqlalchemy import text, DateTime
+
+# =================================================
+# Issue Ticket Full-Text Search
+# =================================================
+# Description and resolution are indexed inside the database so the index
+# changes in the same statement as the row:
+#
+#   SQLite    external-content FTS5 table keyed by issue_tickets.number,
+#             maintained by triggers (no second copy of the text)
+#   Postgres  generated tsvector column with a GIN index
+#
+# Both are created by the after_create hook on issue_tickets for new
+# databases and by migration 3 for existing ones. Every statement here
+# is idempotent.
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS issue_tickets_fts USING fts5("
+    "description, resolution, "
+    "content='issue_tickets', content_rowid='number', "
+    "tokenize='porter unicode61')",
+
+    "CREATE TRIGGER IF NOT EXISTS issue_tickets_fts_ai AFTER INSERT ON issue_tickets BEGIN "
+    "INSERT INTO issue_tickets_fts(rowid, description, resolution) "
+    "VALUES (new.number, new.description, new.resolution); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS issue_tickets_fts_ad AFTER DELETE ON issue_tickets BEGIN "
+    "INSERT INTO issue_tickets_fts(issue_tickets_fts, rowid, description, resolution) "
+    "VALUES ('delete', old.number, old.description, old.resolution); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS issue_tickets_fts_au AFTER UPDATE OF number, description, resolution "
+    "ON issue_tickets BEGIN "
+    "INSERT INTO issue_tickets_fts(issue_tickets_fts, rowid, description, resolution) "
+    "VALUES ('delete', old.number, old.description, old.resolution); "
+    "INSERT INTO issue_tickets_fts(rowid, description, resolution) "
+    "VALUES (new.number, new.description, new.resolution); "
+    "END",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE issue_tickets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(resolution, '')), 'B')"
+    ") STORED",
+
+    "CREATE INDEX IF NOT EXISTS ix_issue_tickets_search ON issue_tickets USING GIN (search_vector)",
+]
+
+SQLITE_SEARCH = text(
+    "SELECT t.id, t.status, t.category, t.created_at, "
+    "snippet(issue_tickets_fts, -1, '**', '**', '…', 16) "
+    "FROM issue_tickets_fts f JOIN issue_tickets t ON t.number = f.rowid "
+    "WHERE issue_tickets_fts MATCH :q "
+    "ORDER BY bm25(issue_tickets_fts, 1.0, 0.5) "
+    "LIMIT :limit OFFSET :offset"
+).columns(created_at=DateTime)
+
+POSTGRES_SEARCH = text(
+    "SELECT id, status, category, created_at, "
+    "ts_headline('english', coalesce(description, '') || ' ' || coalesce(resolution, ''), q, "
+    "'StartSel=**, StopSel=**, MaxWords=24, MinWords=8') "
+    "FROM ("
+    "SELECT t.*, q, ts_rank(t.search_vector, q) AS rank "
+    "FROM issue_tickets t, websearch_to_tsquery('english', :q) AS q "
+    "WHERE t.search_vector @@ q "
+    "ORDER BY rank DESC, t.number DESC "
+    "LIMIT :limit OFFSET :offset"
+    ") AS hits ORDER BY rank DESC, number DESC"
+).columns(created_at=DateTime)
+
+
+def create_issue_search(conn):
+    """Create the search index structures for the connection's dialect"""
+    ddl = POSTGRES_DDL if conn.dialect.name == "postgresql" else SQLITE_DDL
+    for statement in ddl:
+        conn.execute(text(statement))
+
+
+def rebuild_issue_search(conn):
+    """Re-index every existing row (Postgres generated columns need nothing)"""
+    if conn.dialect.name != "postgresql":
+        conn.execute(text("INSERT INTO issue_tickets_fts(issue_tickets_fts) VALUES ('rebuild')"))
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every word so user input can't hit FTS5 query syntax;
+    # the last word is a prefix match for search-as-you-type
+    terms = ['"' + word.replace('"', '""') + '"' for word in query.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_issue_tickets(conn, query: str, limit: int, offset: int):
+    """Ranked rows of (id, status, category, created_at, snippet)"""
+    if conn.dialect.name == "postgresql":
+        statement, q = POSTGRES_SEARCH, query
+    else:
+        statement, q = SQLITE_SEARCH, _fts5_query(query)
+
+    if not q.strip():
+        return []
+    return conn.execute(statement, {"q": q, "limit": limit, "offset": offset}).all()
@@ -0,0 +1,186 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import text
+
+# =================================================
+# Ticket Statistics
+# =================================================
+# Rollup counters kept in ticket_stats as (kind, metric, bucket) -> value.
+# Changes are appended to ticket_stat_deltas in the same transaction as
+# the change they count and folded into ticket_stats every
+# STATS_FOLD_SECONDS, so writers never contend on a shared counter row
+# and /ticket_stats reads a handful of rows instead of scanning the
+# ticket tables. Durations are stored as histograms over fixed buckets, which
+# makes medians approximate: the reported value is the upper bound of
+# the bucket the median falls into.
+#
+# Metrics:
+#   status       tickets currently in each status (queue depth)
+#   level        study tickets created per level
+#   category     issue tickets created per category
+#   priority     issue tickets created per priority
+#   created_day  tickets created per UTC day (YYYY-MM-DD)
+#   claims_by    claims per admin / mod ID
+#   claim_time   histogram of created -> claimed, in seconds
+#   close_time   histogram of created -> approved/cancelled/resolved/invalid
+
+DURATION_BUCKETS = (
+    60, 5 * 60, 15 * 60, 30 * 60,
+    3600, 3 * 3600, 6 * 3600, 12 * 3600,
+    86400, 2 * 86400, 3 * 86400, 7 * 86400, 14 * 86400, 30 * 86400,
+)
+
+CLAIMED_STATUSES = {"CLAIMED", "IN_PROGRESS"}
+CLOSED_STATUSES = {"APPROVED", "CANCELLED", "RESOLVED", "INVALID"}
+
+
+def day_bucket(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d")
+
+
+def duration_bucket(seconds: float) -> str:
+    for bound in DURATION_BUCKETS:
+        if seconds <= bound:
+            return str(bound)
+    return "inf"
+
+
+def creation_deltas(status: str, created_at: datetime, **dimensions):
+    """Counters for a newly created ticket; dimensions are level/category/priority"""
+    deltas = [("status", status, 1), ("created_day", day_bucket(created_at), 1)]
+    deltas.extend((metric, value, 1) for metric, value in dimensions.items() if value)
+    return deltas
+
+
+def transition_deltas(old_status: str, new_status: str, created_at: datetime, claimed_by=None, now: datetime = None):
+    """Counters for a ticket moving from old_status to new_status"""
+    if new_status is None or new_status == old_status:
+        return []
+
+    now = now or datetime.utcnow()
+    deltas = [("status", old_status, -1), ("status", new_status, 1)]
+
+    if new_status in CLAIMED_STATUSES:
+        if claimed_by is not None:
+            deltas.append(("claims_by", str(claimed_by), 1))
+        if created_at:
+            deltas.append(("claim_time", duration_bucket((now - created_at).total_seconds()), 1))
+
+    if new_status in CLOSED_STATUSES and created_at:
+        deltas.append(("close_time", duration_bucket((now - created_at).total_seconds()), 1))
+
+    if old_status in CLAIMED_STATUSES and new_status == "OPEN":
+        # A claim given back right after it was made (see release_ticket);
+        # its claim_time bucket is still the one the claim counted
+        if claimed_by is not None:
+            deltas.append(("claims_by", str(claimed_by), -1))
+        if created_at:
+            deltas.append(("claim_time", duration_bucket((now - created_at).total_seconds()), -1))
+
+    return deltas
+
+
+def merge_deltas(deltas):
+    """Collapse repeated (metric, bucket) keys and sort them for a stable lock order"""
+    merged = Counter()
+    for metric, bucket, delta in deltas:
+        merged[(metric, bucket)] += delta
+    return [(metric, bucket, delta) for (metric, bucket), delta in sorted(merged.items()) if delta]
+
+
+def approx_median(histogram: dict):
+    """Upper bound in seconds of the bucket holding the median (inf for overflow), or None"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    seen = 0
+    for bound in [str(b) for b in DURATION_BUCKETS] + ["inf"]:
+        seen += histogram.get(bound, 0)
+        if seen * 2 >= total:
+            return float(bound)
+    return float("inf")
+
+
+def format_duration(seconds) -> str:
+    if seconds is None:
+        return "n/a"
+    if seconds == float("inf"):
+        return f"> {format_duration(DURATION_BUCKETS[-1])}"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+
+def _as_datetime(value):
+    # Raw SQLite rows hand back DATETIME columns as text
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def study_ticket_deltas(status, level, claimed_by, created_at, cancelled_at):
+    """Counters an existing study ticket row contributes (rebuilds, imports)"""
+    created_at = _as_datetime(created_at) or datetime.utcnow()
+    deltas = creation_deltas(status, created_at, level=level)
+    if claimed_by:
+        deltas.append(("claims_by", str(claimed_by), 1))
+    if status == "CANCELLED" and cancelled_at:
+        seconds = (_as_datetime(cancelled_at) - created_at).total_seconds()
+        deltas.append(("close_time", duration_bucket(seconds), 1))
+    return deltas
+
+
+def issue_ticket_deltas(status, category, priority, claimed_by, created_at, resolved_at):
+    """Counters an existing issue ticket row contributes (rebuilds, imports)"""
+    created_at = _as_datetime(created_at) or datetime.utcnow()
+    deltas = creation_deltas(status, created_at, category=category, priority=priority)
+    if claimed_by:
+        deltas.append(("claims_by", str(claimed_by), 1))
+    if resolved_at:
+        seconds = (_as_datetime(resolved_at) - created_at).total_seconds()
+        deltas.append(("close_time", duration_bucket(seconds), 1))
+    return deltas
+
+
+def rebuild_ticket_stats(conn):
+    """
+    Recompute every counter from the ticket tables (migration 2).
+
+    Claim times are not stored on the rows, so claim_time starts empty;
+    claims per admin and close times are recovered from the ticket rows.
+    """
+    counters = {"study": Counter(), "issue": Counter()}
+
+    def add(kind, deltas):
+        for metric, bucket, delta in deltas:
+            counters[kind][(metric, bucket)] += delta
+
+    rows = conn.execute(text(
+        "SELECT status, level, claimed_by, created_at, cancelled_at FROM tickets"
+    ))
+    for row in rows:
+        add("study", study_ticket_deltas(*row))
+
+    rows = conn.execute(text(
+        "SELECT status, category, priority, claimed_by, created_at, resolved_at FROM issue_tickets"
+    ))
+    for row in rows:
+        add("issue", issue_ticket_deltas(*row))
+
+    conn.execute(text("DELETE FROM ticket_stat_deltas"))
+    conn.execute(text("DELETE FROM ticket_stats"))
+    rows = [
+        {"k": kind, "m": metric, "b": bucket, "v": value}
+        for kind, counter in counters.items()
+        for (metric, bucket), value in counter.items()
+        if value
+    ]
+    if rows:
+        conn.execute(
+            text("INSERT INTO ticket_stats (kind, metric, bucket, value) VALUES (:k, :m, :b, :v)"),
+            rows,
+        )
@@ -1,12 +1,18 @@
 import os
 import json
+import time
+from datetime import datetime
+
+import config
 
 
 STATE_FILE = "data/state.json"
 
 
 DEFAULT_STATE = {
-    "posted_announcements": []
+    "posted_announcements": [],
+    "posted_messages": {},  # key -> message ID of the entry / welcome / rules posts
+    "command_hashes": {}  # "global" / "guild:<id>" -> sha256 of the last synced command tree
 }
 
 
@@ -15,4 +21,148 @@ def ensure_state_file():
 
     if not os.path.exists(STATE_FILE):
         with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(DEFAULT_STATE, f, indent=2)
\ No newline at end of file
+            json.dump(DEFAULT_STATE, f, indent=2)
+
+
+def load_state():
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state):
+    # Write then rename, so a crash mid-write never leaves a truncated file
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def get_posted_message_id(key: str):
+    """Message ID remembered for a bot post (entry / welcome / rules), or None"""
+    return load_state().get("posted_messages", {}).get(key)
+
+
+def remember_posted_message(key: str, message_id: int):
+    state = load_state()
+    state.setdefault("posted_messages", {})[key] = message_id
+    save_state(state)
+
+
+def get_command_hash(scope: str):
+    """Hash of the command tree last synced to scope ("global" or "guild:<id>"), or None"""
+    return load_state().get("command_hashes", {}).get(scope)
+
+
+def remember_command_hash(scope: str, digest):
+    """Record a successful sync; digest None forgets the scope"""
+    state = load_state()
+    hashes = state.setdefault("command_hashes", {})
+    if digest is None:
+        hashes.pop(scope, None)
+    else:
+        hashes[scope] = digest
+    save_state(state)
+
+
+# On-demand member lookups (lean gateway cache profile), shown in /db_stats
+member_fetch_stats = {"queries": 0, "members": 0, "seconds": 0.0}
+
+
+def _record_fetch(start: float, members: int):
+    member_fetch_stats["queries"] += 1
+    member_fetch_stats["members"] += members
+    member_fetch_stats["seconds"] += time.perf_counter() - start
+
+
+async def get_members(guild, user_ids) -> dict:
+    """
+    {user_id: Member} for user_ids, from the member cache where possible
+    and one gateway query per 100 IDs for the rest. Users who have left
+    the guild are missing from the result.
+    """
+    found, missing = {}, []
+    for uid in user_ids:
+        member = guild.get_member(uid)
+        if member:
+            found[uid] = member
+        else:
+            missing.append(uid)
+
+    for i in range(0, len(missing), 100):
+        start = time.perf_counter()
+        batch = await guild.query_members(user_ids=missing[i:i + 100], limit=100, cache=False)
+        _record_fetch(start, len(batch))
+        found.update((member.id, member) for member in batch)
+    return found
+
+
+# role_id -> (member IDs, monotonic time loaded), for guilds whose member
+# list is not cached. Kept current by note_member_roles (on_member_update)
+# and reloaded every ROLE_MEMBER_REFRESH_MINUTES to catch role changes on
+# members the bot does not cache.
+_role_members = {}
+
+
+async def get_role_members(guild, role) -> list:
+    """Members holding role, without downloading the member list per call"""
+    if guild.chunked:
+        return list(role.members)
+
+    entry = _role_members.get(role.id)
+    if entry is None or time.monotonic() - entry[1] > config.ROLE_MEMBER_REFRESH_MINUTES * 60:
+        start = time.perf_counter()
+        everyone = await guild.chunk(cache=False)
+        _record_fetch(start, len(everyone))
+        entry = _role_members[role.id] = ({m.id for m in everyone if m.get_role(role.id)}, time.monotonic())
+
+    # Fetched members carry current roles; drop anyone who lost the role
+    members = [m for m in (await get_members(guild, list(entry[0]))).values() if m.get_role(role.id)]
+    entry[0].intersection_update(m.id for m in members)
+    return members
+
+
+def note_member_roles(member):
+    """Apply a member's current roles to the role member cache"""
+    for role_id, (member_ids, _) in _role_members.items():
+        if member.get_role(role_id):
+            member_ids.add(member.id)
+        else:
+            member_ids.discard(member.id)
+
+
+def parse_date(value: str):
+    """Parse a YYYY-MM-DD command argument; None stays None"""
+    if not value:
+        return None
+    return datetime.strptime(value.strip(), "%Y-%m-%d")
+
+
+def format_ticket_event(event) -> str:
+    """One line of ticket history: time, event, actor and payload details"""
+    line = f"`{event.created_at:%Y-%m-%d %H:%M}` **{event.event_type}**"
+    if event.actor_id:
+        line += f" by <@{event.actor_id}>"
+    details = ", ".join(f"{k}: {v}" for k, v in event.payload.items())
+    if details:
+        line += f" — {details}"
+    return line
+
+
+def format_ticket_history(events, max_length: int = 4000) -> str:
+    """Event lines for one embed description, dropping the oldest if they do not fit"""
+    lines = [format_ticket_event(e) for e in events]
+    while len(lines) > 1 and len("\n".join(lines)) > max_length:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+# Ticket-scoped buttons (claim, cancel, issue actions) are DynamicItems
+# whose custom_id carries the ticket ID, parsed by one registered template
+# per button, so nothing is registered per ticket. Messages posted before
+# that used fixed custom_ids; for those the ticket is looked up from the
+# message or thread the button sits on.
+async def custom_id_ticket_id(match, legacy_lookup, *args, **kwargs):
+    """Ticket ID from a button's custom_id match, or legacy_lookup() for fixed IDs"""
+    if match["ticket_id"]:
+        return match["ticket_id"]
+    return await legacy_lookup(*args, **kwargs)
\ No newline at end of file